@@ -188,6 +188,7 @@ module "footystats-get-footystats" {
   name                             = "footystats_get_data"
   docker_repository                = google_artifact_registry_repository.repository.id
   bucket_name                      = module.buckets.names["gcf"]
+  timeout_s                        = 540
   available_cpu                    = 1
   available_memory                 = "512Mi"
   max_instance_request_concurrency = 80
@@ -473,12 +474,16 @@ module "solver" {
   timeout_s             = 540
   available_memory      = "1Gi"
   available_cpu         = 2
-  environment_variables = { BUCKET_NAME = module.buckets.names["solver"] }
-  event_type            = "google.cloud.pubsub.topic.v1.messagePublished"
-  topic_name            = module.pubsub-solver.id
-  source_directory      = "../../src/function"
-  region                = var.region
-  project_id            = module.project.project_id
+  environment_variables = {
+    BUCKET_NAME     = module.buckets.names["solver"]
+    MAX_WORKERS     = 2
+    SOLVER_BACKENDS = jsonencode({ International = { backend = "irls", tolerance = 0.0001 } })
+  }
+  event_type       = "google.cloud.pubsub.topic.v1.messagePublished"
+  topic_name       = module.pubsub-solver.id
+  source_directory = "../../src/function"
+  region           = var.region
+  project_id       = module.project.project_id
 }
 
 module "bigquery-solver" {
@@ -517,6 +522,25 @@ module "bigquery-solver" {
         }
       ]
     }
+    get_match_history = {
+      definition_body = templatefile("../../src/bigquery/sql/solver/get_match_history.sql", { project_id = module.project.project_id })
+      routine_type    = "TABLE_VALUED_FUNCTION"
+      language        = "SQL"
+      arguments = [
+        {
+          name      = "league_type"
+          data_type = jsonencode({ "typeKind" : "STRING" })
+        },
+        {
+          name      = "min_time"
+          data_type = jsonencode({ "typeKind" : "INT64" })
+        },
+        {
+          name      = "max_time"
+          data_type = jsonencode({ "typeKind" : "INT64" })
+        }
+      ]
+    }
     get_messages = {
       definition_body = templatefile("../../src/bigquery/sql/solver/get_messages.sql", { project_id = module.project.project_id })
       routine_type    = "TABLE_VALUED_FUNCTION"
@@ -568,9 +592,12 @@ module "simulate-tournament" {
   docker_repository = google_artifact_registry_repository.repository.id
   bucket_name       = module.buckets.names["gcf"]
   timeout_s         = 300
+  available_memory  = "1Gi"
+  available_cpu     = 2
   environment_variables = {
     INPUT_BUCKET_NAME  = module.buckets.names["manual"],
-    RESULT_BUCKET_NAME = module.buckets.names["simulation"]
+    RESULT_BUCKET_NAME = module.buckets.names["simulation"],
+    MAX_WORKERS        = 2
   }
   event_type       = "google.cloud.pubsub.topic.v1.messagePublished"
   topic_name       = module.pubsub-simulate-tournament.id
@@ -715,7 +742,6 @@ module "bigquery-operations" {
   project_id = module.project.project_id
   views = {
     get_daily_suggestions = file("../../src/bigquery/sql/operations/get_daily_suggestions.sql")
-    get_kelly_ratio       = file("../../src/bigquery/sql/operations/get_kelly_ratio.sql")
     map_hkjc_team_list    = file("../../src/bigquery/sql/operations/map_hkjc_team_list.sql")
     map_hkjc_teams        = file("../../src/bigquery/sql/operations/map_hkjc_teams.sql")
     map_hkjc_tournaments  = file("../../src/bigquery/sql/operations/map_hkjc_tournaments.sql")
@@ -1,4 +1,10 @@
-WITH _odds AS (
+WITH _snapshots AS (
+  SELECT * EXCEPT(_SNAPSHOT_TIMESTAMP),
+    COALESCE(_SNAPSHOT_TIMESTAMP, _TIMESTAMP) AS snapshot_timestamp
+  FROM hkjc.odds
+),
+
+_odds AS (
   SELECT odds.id,
     MAX(CASE WHEN pool.oddsType = "HAD" AND combination.str = "H" THEN combination.currentOdds END) AS HAD_H,
     MAX(CASE WHEN pool.oddsType = "HAD" AND combination.str = "D" THEN combination.currentOdds END) AS HAD_D,
@@ -6,14 +12,15 @@ WITH _odds AS (
     MAX(CASE WHEN pool.oddsType = "HDC" AND combination.str = "H" THEN combination.currentOdds END) AS HDC_H,
     MAX(CASE WHEN pool.oddsType = "HDC" AND combination.str = "A" THEN combination.currentOdds END) AS HDC_A,
     MAX(CASE WHEN pool.oddsType = "HDC" THEN line.condition END) AS handicap,
+    snapshot_timestamp,
     _TIMESTAMP
-  FROM hkjc.odds,
+  FROM _snapshots AS odds,
     UNNEST(foPools) AS pool,
     UNNEST(pool.lines) AS line,
     UNNEST(line.combinations) AS combination
   WHERE odds.status = 'PREEVENT'
     AND line.status = 'AVAILABLE'
-  GROUP BY odds.id, _TIMESTAMP
+  GROUP BY odds.id, snapshot_timestamp, _TIMESTAMP
 )
 
 SELECT
@@ -36,6 +43,7 @@ SELECT
   HDC_A,
   handicap,
   updateAt AS update_at,
+  snapshot_timestamp,
   _TIMESTAMP
-FROM hkjc.odds
-JOIN _odds USING (id, _TIMESTAMP)
\ No newline at end of file
+FROM _snapshots
+JOIN _odds USING (id, snapshot_timestamp, _TIMESTAMP)
\ No newline at end of file
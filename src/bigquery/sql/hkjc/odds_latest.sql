@@ -1,3 +1,3 @@
 SELECT *
 FROM `hkjc.odds_clean`
-QUALIFY ROW_NUMBER() OVER (PARTITION BY id ORDER BY _TIMESTAMP DESC) = 1
\ No newline at end of file
+QUALIFY ROW_NUMBER() OVER (PARTITION BY id ORDER BY snapshot_timestamp DESC) = 1
\ No newline at end of file
@@ -1,9 +1,32 @@
-SELECT * EXCEPT(_TIMESTAMP)
+WITH _since AS (
+  SELECT TIMESTAMP_SUB(MAX(_TIMESTAMP), INTERVAL 1 HOUR) AS _TIMESTAMP
+  FROM `hkjc.odds`
+),
+
+_snapshots AS (
+  SELECT id, COALESCE(_SNAPSHOT_TIMESTAMP, _TIMESTAMP) AS snapshot_timestamp, _TIMESTAMP, _KEYFRAME
+  FROM `hkjc.odds`
+  WHERE _TIMESTAMP >= (SELECT _TIMESTAMP FROM _since)
+),
+
+_keyframe AS (
+  SELECT id
+  FROM _snapshots
+  WHERE _KEYFRAME
+  QUALIFY snapshot_timestamp = MAX(snapshot_timestamp) OVER ()
+),
+
+_latest AS (
+  SELECT id, snapshot_timestamp, _TIMESTAMP
+  FROM _snapshots
+  WHERE id IN (SELECT id FROM _keyframe)
+  QUALIFY ROW_NUMBER() OVER (PARTITION BY id ORDER BY snapshot_timestamp DESC) = 1
+)
+
+SELECT * EXCEPT(snapshot_timestamp, _TIMESTAMP)
 FROM `hkjc.odds_clean`
-WHERE _TIMESTAMP = (
-    SELECT MAX(_TIMESTAMP)
-    FROM `hkjc.odds`
-  )
+JOIN _latest USING (id, snapshot_timestamp, _TIMESTAMP)
+WHERE _TIMESTAMP >= (SELECT _TIMESTAMP FROM _since)
   AND tournament_id NOT IN ('E2Q', 'CLB', 'CUP')
   AND home_name NOT LIKE '%奧足'
   AND home_name NOT LIKE '%U2_'
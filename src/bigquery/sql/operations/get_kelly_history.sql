@@ -0,0 +1,28 @@
+SELECT
+  kick_off_time,
+  avg_goal + league_solver.home_adv * odds_latest.home_adv + home_solver.offence + away_solver.defence AS home_exp,
+  avg_goal - league_solver.home_adv * odds_latest.home_adv + away_solver.offence + home_solver.defence AS away_exp,
+  handicap,
+  HDC_H,
+  HDC_A,
+  home_score - away_score AS goal_diff
+FROM hkjc.odds_latest
+JOIN hkjc.scores USING(id)
+JOIN `master.teams` home_teams ON odds_latest.home_id = home_teams.hkjc_id
+JOIN `solver.teams` home_solver ON home_solver.id = home_teams.solver_id
+  AND home_solver._TYPE = home_teams.type
+  AND odds_latest.snapshot_timestamp >= TIMESTAMP_SECONDS(home_solver._DATE_UNIX)
+JOIN `master.teams` away_teams ON odds_latest.away_id = away_teams.hkjc_id
+JOIN `solver.teams` away_solver ON away_solver.id = away_teams.solver_id
+  AND away_solver._TYPE = away_teams.type
+  AND away_solver._DATE_UNIX = home_solver._DATE_UNIX
+JOIN master.leagues ON odds_latest.tournament_id = leagues.hkjc_id
+JOIN `solver.leagues` league_solver ON leagues.division = league_solver.division
+  AND league_solver._TYPE = leagues.type
+  AND league_solver._DATE_UNIX = home_solver._DATE_UNIX
+WHERE
+  (SAFE_CAST(home_teams.solver_id AS INT64) IS NOT NULL OR home_teams.type = 'International')
+  AND (SAFE_CAST(away_teams.solver_id AS INT64) IS NOT NULL OR away_teams.type = 'International')
+  AND kick_off_time >= '2024-09-28'
+QUALIFY ROW_NUMBER() OVER (PARTITION BY odds_latest.id ORDER BY home_solver._DATE_UNIX DESC) = 1
+ORDER BY kick_off_time, id
\ No newline at end of file
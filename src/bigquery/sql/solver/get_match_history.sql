@@ -0,0 +1,42 @@
+WITH matches AS (
+  SELECT
+    matches.id,
+    home_teams.solver_id AS home_id,
+    home_teams.in_team_rating AS home_team_in_rating,
+    away_teams.solver_id AS away_id,
+    away_teams.in_team_rating AS away_team_in_rating,
+    division,
+    CASE
+      WHEN (is_league OR home_teams.country = away_teams.country)AND league_type = 'Club' THEN 1
+      ELSE 5
+    END
+    AS cut_off_year,
+    date_unix,
+    home_avg,
+    away_avg
+  FROM ${project_id}.footystats.matches
+  JOIN `${project_id}.master.teams` home_teams ON matches.homeID = home_teams.footystats_id
+  JOIN `${project_id}.master.teams` away_teams ON matches.awayID = away_teams.footystats_id
+  JOIN ${project_id}.master.leagues ON matches._NAME = leagues.footystats_name
+  JOIN ${project_id}.footystats.matches_transformed USING (id)
+  WHERE matches.status = 'complete'
+    AND date_unix <= max_time
+    AND home_teams.solver_id <> away_teams.solver_id
+    AND home_teams.type = league_type
+    AND away_teams.type = league_type
+    AND leagues.type = league_type
+)
+
+SELECT
+  id,
+  division AS league_name,
+  home_id,
+  home_team_in_rating,
+  away_id,
+  away_team_in_rating,
+  cut_off_year,
+  date_unix,
+  home_avg,
+  away_avg
+FROM matches
+WHERE min_time - date_unix < 365 * 24 * 60 * 60 * cut_off_year
\ No newline at end of file
@@ -1,3 +1,5 @@
+import base64
+import hashlib
 import json
 import logging
 import ssl
@@ -28,11 +30,19 @@ def upload_json_to_bucket(
     blob_name: str,
     bucket_name: str,
     hive_partitioning: dict | None = None,
+    skip_unchanged: bool = False,
 ):
     blob_name = get_directory(blob_name, hive_partitioning)
     blob = CLIENT.bucket(bucket_name).blob(blob_name)
     data = convert_to_newline_delimited_json(data)
 
+    # GCS keeps an MD5 of every object, so an identical upload can be skipped
+    if skip_unchanged and (existing := CLIENT.bucket(bucket_name).get_blob(blob_name)):
+        md5_hash = base64.b64encode(hashlib.md5(data.encode()).digest()).decode()
+        if existing.md5_hash == md5_hash:
+            logging.info(f"Blob unchanged: {blob_name=}")
+            return
+
     try:
         blob.upload_from_string(data)
         logging.info(f"Uploaded blob: {blob_name=}")
@@ -1,9 +1,16 @@
 import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable
 
 import functions_framework
 import requests
 from cloudevents.http.event import CloudEvent
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
 from gcp import storage
 from gcp.logging import setup_logging
@@ -18,62 +25,165 @@ BUCKET_NAMES = {
     "tables": os.environ["TABLES_BUCKET_NAME"],
     "teams": os.environ["TEAMS_BUCKET_NAME"],
 }
+MAX_CONCURRENCY = 4
+MAX_ROUNDS = 3
+MAX_SEASONS = 4
+REQUESTS_PER_SECOND = 5
 
 
 class TooManyRequestsError(Exception):
     pass
 
 
+@dataclass
+class RateLimiter:
+    requests_per_second: float
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def wait(self):
+        # Spread request starts across every thread sharing this limiter
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + 1 / self.requests_per_second
+        if delay > 0:
+            time.sleep(delay)
+
+
 @functions_framework.cloud_event
 def main(cloud_event: CloudEvent):
     message = decode_message(cloud_event)
-    endpoint, season_id = message["endpoint"], message["season_id"]
+    if "seasons" in message:
+        get_seasons(message["endpoint"], message["seasons"])
+    else:
+        get_season(message["endpoint"], message)
+
+
+def get_seasons(endpoint: str, seasons: list[dict]):
+    with ThreadPoolExecutor(MAX_SEASONS) as executor:
+        futures = [executor.submit(get_season, endpoint, season) for season in seasons]
+
+    errors = []
+    for season, future in zip(seasons, futures):
+        if error := future.exception():
+            season_id = season["season_id"]
+            logging.warning(
+                f"Get footystats season failed: {endpoint=}, {season_id=}",
+                exc_info=error,
+            )
+            errors.append(error)
+
+    # Retrying the whole batch is cheap as unchanged blobs are not uploaded again
+    if errors:
+        raise_for_errors(errors)
+
+
+def is_too_many_requests(error: BaseException) -> bool:
+    if isinstance(error, TooManyRequestsError):
+        return True
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code == 429
+
+
+def raise_for_errors(errors: list[BaseException]):
+    # Only rate limits are reported as such, anything else keeps its traceback
+    for error in errors:
+        if not is_too_many_requests(error):
+            raise error
+    raise TooManyRequestsError()
+
+
+def get_season(endpoint: str, season: dict):
     data = get_footystats(
-        endpoint, key=os.environ["FOOTYSTATS_API_KEY"], season_id=season_id
+        endpoint, key=os.environ["FOOTYSTATS_API_KEY"], season_id=season["season_id"]
     )
     storage.upload_json_to_bucket(
         data,
         blob_name=f"{endpoint}.json",
         bucket_name=BUCKET_NAMES[endpoint],
         hive_partitioning={
-            "_COUNTRY": message["country"],
-            "_NAME": message["name"],
-            "_YEAR": message["year"],
-            "_SEASON_ID": season_id,
+            "_COUNTRY": season["country"],
+            "_NAME": season["name"],
+            "_YEAR": season["year"],
+            "_SEASON_ID": season["season_id"],
         },
+        skip_unchanged=True,
     )
 
 
-def get_footystats(endpoint: str, key: str, **kwargs) -> dict | list[dict]:
-    page = 1
-    results = []
+def get_session(max_concurrency: int = MAX_CONCURRENCY) -> requests.Session:
+    # Keep-alive connections for every concurrent page, retrying rate limits
+    # and server errors with backoff that respects Retry-After, then handing
+    # back the last response so raise_for_status keeps its status code
+    retry = Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_maxsize=max_concurrency * MAX_SEASONS, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
 
-    while True:
-        logging.info(f"Getting footystats data: {endpoint=}, {page=}, {kwargs=}")
 
-        try:
-            response = requests.get(
-                f"https://api.football-data-api.com/league-{endpoint}",
-                params={"key": key, "page": page, **kwargs},
-                timeout=5,
-            )
-            response.raise_for_status()
-        except (requests.exceptions.HTTPError, requests.exceptions.ReadTimeout):
-            logging.warning(
-                f"Get footystats data failed: {endpoint=}, {page=}, {kwargs=}"
-            )
-            raise TooManyRequestsError()
+SESSION = get_session()
+RATE_LIMITER = RateLimiter(REQUESTS_PER_SECOND)
+
 
-        response = response.json()
-        data = response["data"]
+def get_footystats(endpoint: str, key: str, **kwargs) -> dict | list[dict]:
+    # Page 1 tells how many pages there are, the rest are fetched together
+    first = get_pages(endpoint, key, [1], **kwargs)[1]
+    if isinstance(first["data"], dict):
+        return first["data"]
+
+    max_page = first["pager"]["max_page"]
+    pages = {1: first} | get_pages(endpoint, key, range(2, max_page + 1), **kwargs)
+    return [result for page in sorted(pages) for result in pages[page]["data"]]
+
+
+def get_pages(
+    endpoint: str, key: str, pages: Iterable[int], **kwargs
+) -> dict[int, dict]:
+    results, errors = {}, {}
+    missing = list(pages)
+
+    # Pages that fail are retried in the next round, keeping those already fetched
+    for _round in range(MAX_ROUNDS):
+        with ThreadPoolExecutor(MAX_CONCURRENCY) as executor:
+            futures = {
+                page: executor.submit(get_page, endpoint, key, page, **kwargs)
+                for page in missing
+            }
+        for page, future in futures.items():
+            try:
+                results[page] = future.result()
+            except requests.exceptions.RequestException as error:
+                errors[page] = error
+                logging.warning(
+                    f"Get footystats data failed: {endpoint=}, {page=}, {kwargs=}, {error=}"
+                )
+        missing = [page for page in missing if page not in results]
+        if not missing:
+            return results
+        if _round < MAX_ROUNDS - 1:
+            time.sleep(2**_round)
 
-        if isinstance(data, dict):
-            return data
-        results.extend(data)
+    raise_for_errors([errors[page] for page in missing])
 
-        logging.info(f"Got footystats data: {endpoint=}, {page=}, {kwargs=}")
 
-        pager = response["pager"]
-        if pager["current_page"] >= pager["max_page"]:
-            return results
-        page += 1
+def get_page(endpoint: str, key: str, page: int, **kwargs) -> dict:
+    logging.info(f"Getting footystats data: {endpoint=}, {page=}, {kwargs=}")
+    RATE_LIMITER.wait()
+    response = SESSION.get(
+        f"https://api.football-data-api.com/league-{endpoint}",
+        params={"key": key, "page": page, **kwargs},
+        timeout=5,
+    )
+    response.raise_for_status()
+    logging.info(f"Got footystats data: {endpoint=}, {page=}, {kwargs=}")
+    return response.json()
@@ -10,8 +10,9 @@ def main(_):
     seasons = bigquery.query_dict(
         query="SELECT * FROM footystats.get_season_id_delta();"
     )
-    for season in seasons:
+    # One message for every season so a single instance fetches them together
+    if seasons:
         pubsub.publish_json_message(
             topic=os.environ["TOPIC_NAME"],
-            data={"endpoint": "matches", **season},
+            data={"endpoint": "matches", "seasons": seasons},
         )
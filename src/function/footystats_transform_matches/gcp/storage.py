@@ -1,12 +1,16 @@
+import io
 import json
 import logging
 import ssl
 import urllib3
+from typing import Iterable
 
 import requests
+from google.api_core.exceptions import NotFound
 from google.cloud import storage
 
 CLIENT = storage.Client()
+READ_BUFFER_SIZE = 1024 * 1024
 
 
 class GCSUploadError(Exception):
@@ -23,6 +27,19 @@ def download_blob(blob_name: str, bucket_name: str) -> str:
     return CLIENT.bucket(bucket_name).blob(blob_name).download_as_text()
 
 
+def download_json(blob_name: str, bucket_name: str) -> dict | list | None:
+    try:
+        return json.loads(download_blob(blob_name, bucket_name))
+    except NotFound:
+        return None
+
+
+def open_blob(blob_name: str, bucket_name: str) -> io.BufferedIOBase:
+    # BlobReader has no buffered readline, iterating it reads a byte at a time
+    reader = CLIENT.bucket(bucket_name).blob(blob_name).open("rb")
+    return io.BufferedReader(reader, buffer_size=READ_BUFFER_SIZE)
+
+
 def upload_json_to_bucket(
     data: list[dict],
     blob_name: str,
@@ -46,6 +63,31 @@ def upload_json_to_bucket(
         raise GCSUploadError()
 
 
+def upload_lines_to_bucket(
+    lines: Iterable[bytes],
+    blob_name: str,
+    bucket_name: str,
+    hive_partitioning: dict | None = None,
+):
+    """Stream newline delimited lines to a blob with a resumable upload."""
+    blob_name = get_directory(blob_name, hive_partitioning)
+    blob = CLIENT.bucket(bucket_name).blob(blob_name)
+
+    try:
+        with blob.open("wb", ignore_flush=True) as f:
+            for i, line in enumerate(lines):
+                f.write(b"\n" + line if i else line)
+        logging.info(f"Uploaded blob: {blob_name=}")
+    except (
+        urllib3.exceptions.MaxRetryError,
+        requests.exceptions.ReadTimeout,
+        requests.exceptions.SSLError,
+        ssl.SSLEOFError,
+    ) as error:
+        logging.warning(f"Upload failed: {blob_name=} {error=}")
+        raise GCSUploadError()
+
+
 def get_directory(blob_name: str, hive_partitioning: dict | None = None):
     if hive_partitioning:
         hive_dir = "/".join(
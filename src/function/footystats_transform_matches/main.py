@@ -1,11 +1,18 @@
-import json
+import hashlib
 import logging
 import os
+import posixpath
 import re
 from enum import IntEnum
+from functools import cache
+from itertools import islice
+from typing import Iterable, Iterator
 
 from cloudevents.http.event import CloudEvent
 import functions_framework
+from google.api_core.exceptions import NotFound
+import numpy as np
+import orjson
 
 from gcp import storage
 from gcp.logging import setup_logging
@@ -23,6 +30,42 @@ ADJ_FACTORS = {
     (True, True): 1.05,
 }
 XG_ADJ_FACTOR = 1.1
+BATCH_SIZE = 1000
+
+MINUTE_PATTERN = re.compile(r"(^1?\d{1,2})")
+LATE_LEADING_ADJ_VALS = [
+    max(minute - REDUCE_FROM_MINUTE, 0)
+    / (90 - REDUCE_FROM_MINUTE)
+    * REDUCE_LEADING_GOAL_VALUE
+    for minute in range(91)
+]
+MORE_PLAYER_ADJ_VALS = [
+    (minute / 90) * REDUCE_RED_CARD_GOAL_VALUE for minute in range(91)
+]
+
+TRANSFORM_FIELDS = [
+    "homeGoalCount",
+    "awayGoalCount",
+    "homeGoals",
+    "awayGoals",
+    "goal_timings_recorded",
+    "card_timings_recorded",
+    "team_a_red_cards",
+    "team_b_red_cards",
+    "total_xg",
+    "team_a_xg",
+    "team_b_xg",
+]
+TRANSFORM_PARAMS = orjson.dumps(
+    [
+        REDUCE_FROM_MINUTE,
+        REDUCE_LEADING_GOAL_VALUE,
+        REDUCE_RED_CARD_GOAL_VALUE,
+        XG_WEIGHT,
+        list(ADJ_FACTORS.values()),
+        XG_ADJ_FACTOR,
+    ]
+)
 
 RESULT_BUCKET_NAME = os.environ["BUCKET_NAME"]
 
@@ -32,21 +75,79 @@ def main(cloud_event: CloudEvent):
     message = cloud_event.data
     blob_name = message["name"]
     bucket_name = message["bucket"]
+    manifest_name = get_manifest_name(blob_name)
 
-    logging.info("Transforming blob: %s", blob_name)
-    blob = storage.download_blob(
-        blob_name,
-        bucket_name,
-    )
-    lines = blob.splitlines()
+    manifest = storage.download_json(manifest_name, RESULT_BUCKET_NAME) or {}
+    with storage.open_blob(blob_name, bucket_name) as lines:
+        hashes = {
+            str(match["id"]): get_match_hash(match) for match in read_matches(lines)
+        }
+
+    unchanged = {
+        id for id, match_hash in hashes.items() if manifest.get(id) == match_hash
+    }
+    cached = get_cached_lines(blob_name, unchanged) if unchanged else {}
+    if len(cached) == len(hashes) and manifest.keys() == hashes.keys():
+        logging.info("No changed matches: %s", blob_name)
+        return
+
+    # Read the raw matches again so only a batch of them is held at a time
+    logging.info("Transforming %d matches: %s", len(hashes) - len(cached), blob_name)
+    with storage.open_blob(blob_name, bucket_name) as lines:
+        storage.upload_lines_to_bucket(
+            transform_in_batches(read_matches(lines), cached),
+            blob_name,
+            bucket_name=RESULT_BUCKET_NAME,
+        )
+    storage.upload_json_to_bucket(hashes, manifest_name, bucket_name=RESULT_BUCKET_NAME)
+
+
+def get_cached_lines(blob_name: str, ids: set[str]) -> dict[str, bytes]:
+    # A missing output, deleted or never uploaded, is transformed again
+    try:
+        with storage.open_blob(blob_name, RESULT_BUCKET_NAME) as lines:
+            return {
+                id: line.rstrip()
+                for line in lines
+                if (id := str(orjson.loads(line)["id"])) in ids
+            }
+    except NotFound:
+        logging.warning(f"Transformed matches not found: {blob_name=}")
+        return {}
 
-    data = []
-    for line in lines:
-        match = json.loads(line)
-        match = transform_match(match)
-        data.append(match)
 
-    storage.upload_json_to_bucket(data, blob_name, bucket_name=RESULT_BUCKET_NAME)
+def get_manifest_name(blob_name: str) -> str:
+    # Next to the output, but outside the */matches.json external table
+    return posixpath.join(posixpath.dirname(blob_name), "manifest.json")
+
+
+def get_match_hash(_match: dict) -> str:
+    """Hash of the raw fields and parameters that the transform depends on."""
+    fields = [_match[field] for field in TRANSFORM_FIELDS]
+    return hashlib.blake2b(
+        TRANSFORM_PARAMS + orjson.dumps(fields), digest_size=8
+    ).hexdigest()
+
+
+def read_matches(lines: Iterable[bytes]) -> Iterator[dict]:
+    return (orjson.loads(line) for line in lines if line.strip())
+
+
+def transform_in_batches(
+    matches: Iterable[dict],
+    cached: dict[str, bytes] | None = None,
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[bytes]:
+    # Output lines in the raw order, cached lines are reused in place
+    cached = cached or {}
+    matches = iter(matches)
+    while batch := list(islice(matches, batch_size)):
+        transformed = iter(
+            transform_matches([m for m in batch if str(m["id"]) not in cached])
+        )
+        for m in batch:
+            line = cached.get(str(m["id"]))
+            yield orjson.dumps(next(transformed)) if line is None else line
 
 
 class Team(IntEnum):
@@ -54,100 +155,130 @@ class Team(IntEnum):
     AWAY = 1
 
 
-def transform_match(_match: dict) -> dict:
-    home_adj: float = _match["homeGoalCount"]
-    away_adj: float = _match["awayGoalCount"]
-    more_player_team: Team | None = None
+def transform_matches(matches: list[dict]) -> list[dict]:
+    """Adjusted and xG weighted goals of a batch of matches."""
+    home_adj = np.array([m["homeGoalCount"] for m in matches], dtype=float)
+    away_adj = np.array([m["awayGoalCount"] for m in matches], dtype=float)
+    home_red_cards = np.array([m["team_a_red_cards"] for m in matches], dtype=int)
+    away_red_cards = np.array([m["team_b_red_cards"] for m in matches], dtype=int)
+    card_timings_recorded = np.array(
+        [m["card_timings_recorded"] == 1 for m in matches], dtype=bool
+    )
+    goal_timings_recorded = np.array(
+        [
+            m["goal_timings_recorded"] == 1
+            and "None" not in m["homeGoals"]
+            and "None" not in m["awayGoals"]
+            for m in matches
+        ],
+        dtype=bool,
+    )
 
-    valid_home_goals = all(minute != "None" for minute in _match["homeGoals"])
-    valid_away_goals = all(minute != "None" for minute in _match["awayGoals"])
-    goal_timings_recorded = (
-        _match["goal_timings_recorded"] == 1 and valid_home_goals and valid_away_goals
+    more_player_team = np.select(
+        [
+            card_timings_recorded & (home_red_cards > away_red_cards),
+            card_timings_recorded & (away_red_cards > home_red_cards),
+        ],
+        [Team.AWAY, Team.HOME],
+        -1,
     )
-    card_timings_recorded = _match["card_timings_recorded"] == 1
 
-    if card_timings_recorded:
-        more_player_team = get_more_players_team(
-            _match["team_a_red_cards"], _match["team_b_red_cards"]
-        )
+    red_card_adj = 1 - (REDUCE_RED_CARD_GOAL_VALUE / 2)
+    home_adj = np.where(
+        more_player_team == Team.HOME, home_adj * red_card_adj, home_adj
+    )
+    away_adj = np.where(
+        more_player_team == Team.AWAY, away_adj * red_card_adj, away_adj
+    )
 
-    if goal_timings_recorded:
-        goal_timings = get_goal_timings_dict(_match["homeGoals"], _match["awayGoals"])
-        home_adj, away_adj = reduce_goal_value(goal_timings, more_player_team)
-    elif more_player_team == Team.HOME:
-        home_adj *= 1 - (REDUCE_RED_CARD_GOAL_VALUE / 2)
-    elif more_player_team == Team.AWAY:
-        away_adj *= 1 - (REDUCE_RED_CARD_GOAL_VALUE / 2)
+    goals = np.flatnonzero(goal_timings_recorded)
+    home_adj[goals], away_adj[goals] = reduce_goal_values(
+        [matches[i] for i in goals.tolist()], more_player_team[goals]
+    )
 
-    adj_factor = ADJ_FACTORS[(card_timings_recorded, goal_timings_recorded)]
+    adj_factors = np.array(
+        [
+            [ADJ_FACTORS[(card, goal)] for goal in (False, True)]
+            for card in (False, True)
+        ]
+    )
+    adj_factor = adj_factors[
+        card_timings_recorded.astype(int), goal_timings_recorded.astype(int)
+    ]
     home_adj *= adj_factor
     away_adj *= adj_factor
 
-    if _match["total_xg"] > 0:
-        home_avg = (
-            home_adj * (1 - XG_WEIGHT) + _match["team_a_xg"] * XG_ADJ_FACTOR * XG_WEIGHT
-        )
-        away_avg = (
-            away_adj * (1 - XG_WEIGHT) + _match["team_b_xg"] * XG_ADJ_FACTOR * XG_WEIGHT
+    total_xg = np.array([m["total_xg"] for m in matches], dtype=float)
+    home_xg = np.array([m["team_a_xg"] for m in matches], dtype=float)
+    away_xg = np.array([m["team_b_xg"] for m in matches], dtype=float)
+    home_avg = np.where(
+        total_xg > 0,
+        home_adj * (1 - XG_WEIGHT) + home_xg * XG_ADJ_FACTOR * XG_WEIGHT,
+        home_adj,
+    )
+    away_avg = np.where(
+        total_xg > 0,
+        away_adj * (1 - XG_WEIGHT) + away_xg * XG_ADJ_FACTOR * XG_WEIGHT,
+        away_adj,
+    )
+
+    return [
+        {
+            "id": m["id"],
+            "home_adj": values[0],
+            "away_adj": values[1],
+            "home_avg": values[2],
+            "away_avg": values[3],
+        }
+        for m, values in zip(
+            matches, np.stack([home_adj, away_adj, home_avg, away_avg], axis=1).tolist()
         )
-    else:
-        home_avg, away_avg = home_adj, away_adj
-
-    return {
-        "id": _match["id"],
-        "home_adj": home_adj,
-        "away_adj": away_adj,
-        "home_avg": home_avg,
-        "away_avg": away_avg,
-    }
+    ]
 
 
-def get_more_players_team(home_red_cards: int, away_red_cards: int) -> Team | None:
-    if home_red_cards > away_red_cards:
-        return Team.AWAY
-    if away_red_cards > home_red_cards:
-        return Team.HOME
-    return None
+@cache
+def parse_minute(minute: str) -> int:
+    return int(MINUTE_PATTERN.search(minute).group())
 
 
-def get_goal_timings_dict(home: list[str], away: list[str]) -> list[tuple]:
-    timings = [
-        (int(re.search(r"(^1?\d{1,2})", minute).group()), minute, Team.HOME)
-        for minute in home
-    ]
-    timings.extend(
-        (int(re.search(r"(^1?\d{1,2})", minute).group()), minute, Team.AWAY)
-        for minute in away
+def reduce_goal_values(
+    matches: list[dict], more_player_team: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Goals reduced for a numerical advantage or a late lead of two or more."""
+    goal_counts = np.array(
+        [(len(m["homeGoals"]), len(m["awayGoals"])) for m in matches], dtype=int
+    ).reshape(-1, 2)
+    if not goal_counts.any():
+        return np.zeros(len(matches)), np.zeros(len(matches))
+    match = np.repeat(np.arange(len(matches)), goal_counts.sum(axis=1))
+    team = np.repeat(np.tile([Team.HOME, Team.AWAY], len(matches)), goal_counts.ravel())
+    minutes, minute_order = np.unique(
+        [minute for m in matches for minute in m["homeGoals"] + m["awayGoals"]],
+        return_inverse=True,
+    )
+    timing = np.array([parse_minute(minute) for minute in minutes])[minute_order]
+
+    # Goals in order within each match, by minute, then stoppage time, home first
+    order = np.lexsort((team, minute_order, timing, match))
+    match, team, timing = match[order], team[order], np.minimum(timing[order], 90)
+
+    # Running score within each match after each goal
+    is_home = team == Team.HOME
+    first = np.flatnonzero(np.r_[True, match[1:] != match[:-1]])
+    start = np.repeat(first, np.diff(np.r_[first, len(match)]))
+    home = np.cumsum(is_home) - np.cumsum(is_home)[start] + is_home[start]
+    away = np.cumsum(~is_home) - np.cumsum(~is_home)[start] + ~is_home[start]
+    leading = np.where(is_home, home - away, away - home) > 1
+
+    late_leading_adj_val = np.array(LATE_LEADING_ADJ_VALS)[timing]
+    more_player_adj_val = np.array(MORE_PLAYER_ADJ_VALS)[timing]
+
+    goal_val = np.ones(len(match))
+    goal_val = np.where(
+        team == more_player_team[match], goal_val * (1 - more_player_adj_val), goal_val
+    )
+    goal_val = np.where(leading, goal_val * (1 - late_leading_adj_val), goal_val)
+    return (
+        np.bincount(match[is_home], goal_val[is_home], minlength=len(matches)),
+        np.bincount(match[~is_home], goal_val[~is_home], minlength=len(matches)),
     )
-    return sorted(timings)
-
-
-def reduce_goal_value(
-    goal_timings: list[tuple[int, "Team"]], more_player_team: "Team"
-) -> tuple[float, float]:
-    if not goal_timings:
-        return 0, 0
-    home = home_adj = away = away_adj = 0
-    for timing, _, team in goal_timings:
-        timing = min(timing, 90)
-        late_leading_adj_val = (
-            max(timing - REDUCE_FROM_MINUTE, 0)
-            / (90 - REDUCE_FROM_MINUTE)
-            * REDUCE_LEADING_GOAL_VALUE
-        )
-        more_player_adj_val = (timing / 90) * REDUCE_RED_CARD_GOAL_VALUE
-
-        goal_val = 1
-        if team == more_player_team:
-            goal_val *= 1 - more_player_adj_val
-        if team == Team.AWAY:
-            away += 1
-            if away - home > 1:
-                goal_val *= 1 - late_leading_adj_val
-            away_adj += goal_val
-        elif team == Team.HOME:
-            home += 1
-            if home - away > 1:
-                goal_val *= 1 - late_leading_adj_val
-            home_adj += goal_val
-    return home_adj, away_adj
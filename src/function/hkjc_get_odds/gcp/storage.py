@@ -4,6 +4,7 @@ import ssl
 import urllib3
 
 import requests
+from google.api_core.exceptions import NotFound
 from google.cloud import storage
 
 CLIENT = storage.Client()
@@ -23,6 +24,13 @@ def download_blob(blob_name: str, bucket_name: str) -> str:
     return CLIENT.bucket(bucket_name).blob(blob_name).download_as_text()
 
 
+def download_json(blob_name: str, bucket_name: str) -> dict | list | None:
+    try:
+        return json.loads(download_blob(blob_name, bucket_name))
+    except NotFound:
+        return None
+
+
 def upload_json_to_bucket(
     data: list[dict],
     blob_name: str,
@@ -8,130 +8,150 @@ import requests
 
 from gcp import storage
 from gcp.logging import setup_logging
+from snapshot import Snapshot
 
 setup_logging()
 
 
+SNAPSHOT_BLOB_NAME = "snapshot.json"
+URL = "https://info.cld.hkjc.com/graphql/base/"
+QUERY = """
+query matchList($startIndex: Int, $endIndex: Int,$startDate: String, $endDate: String, $matchIds: [String], $tournIds: [String], $fbOddsTypes: [FBOddsType]!, $fbOddsTypesM: [FBOddsType]!, $inplayOnly: Boolean, $featuredMatchesOnly: Boolean, $frontEndIds: [String], $earlySettlementOnly: Boolean, $showAllMatch: Boolean) {
+  matches(startIndex: $startIndex,endIndex: $endIndex, startDate: $startDate, endDate: $endDate, matchIds: $matchIds, tournIds: $tournIds, fbOddsTypes: $fbOddsTypesM, inplayOnly: $inplayOnly, featuredMatchesOnly: $featuredMatchesOnly, frontEndIds: $frontEndIds, earlySettlementOnly: $earlySettlementOnly, showAllMatch: $showAllMatch) {
+    id
+    frontEndId
+    matchDate
+    kickOffTime
+    status
+    updateAt
+    sequence
+    esIndicatorEnabled
+    homeTeam {
+      id
+      name_en
+      name_ch
+    }
+    awayTeam {
+      id
+      name_en
+      name_ch
+    }
+    tournament {
+      id
+      frontEndId
+      nameProfileId
+      isInteractiveServiceAvailable
+      code
+      name_en
+      name_ch
+    }
+    isInteractiveServiceAvailable
+    inplayDelay
+    venue {
+      code
+      name_en
+      name_ch
+    }
+    tvChannels {
+      code
+      name_en
+      name_ch
+    }
+    liveEvents {
+      id
+      code
+    }
+    featureStartTime
+    featureMatchSequence
+    poolInfo {
+      normalPools
+      inplayPools
+      sellingPools
+      ntsInfo
+      entInfo
+    }
+    runningResult {
+      homeScore
+      awayScore
+      corner
+    }
+    runningResultExtra {
+      homeScore
+      awayScore
+      corner
+    }
+    adminOperation {
+      remark {
+        typ
+      }
+    }
+    foPools(fbOddsTypes: $fbOddsTypes) {
+      id
+      status
+      oddsType
+      instNo
+      inplay
+      name_ch
+      name_en
+      updateAt
+      expectedSuspendDateTime
+      lines {
+        lineId
+        status
+        condition
+        main
+        combinations {
+          combId
+          str
+          status
+          offerEarlySettlement
+          currentOdds
+          selections {
+            selId
+            str
+            name_ch
+            name_en
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
 @functions_framework.cloud_event
 def main(_):
-    storage.upload_json_to_bucket(
-        data=get_hkjc_odds(odds_types=json.loads(os.environ["ODDS_TYPES"])),
-        blob_name="odds.json",
-        bucket_name=os.environ["BUCKET_NAME"],
-        hive_partitioning={"_TIMESTAMP": get_current_timestamp()},
+    bucket_name = os.environ["BUCKET_NAME"]
+    timestamp = datetime.now()
+    matches = get_hkjc_odds(odds_types=json.loads(os.environ["ODDS_TYPES"]))
+
+    snapshot = Snapshot.from_dict(
+        storage.download_json(SNAPSHOT_BLOB_NAME, bucket_name)
     )
+    if changed := snapshot.diff(matches, timestamp):
+        storage.upload_json_to_bucket(
+            data=changed,
+            blob_name="odds.json",
+            bucket_name=bucket_name,
+            hive_partitioning={"_TIMESTAMP": timestamp.isoformat()},
+        )
+    logging.info(f"Got HKJC odds changes: {len(changed)=}, {len(matches)=}")
+
+    # Saved last so a failed upload is diffed against the previous snapshot again
+    storage.upload_json_to_bucket(snapshot.to_dict(), SNAPSHOT_BLOB_NAME, bucket_name)
+
+
+SESSION = requests.Session()
 
 
 def get_hkjc_odds(odds_types: list[str]) -> dict:
     logging.info(f"Getting HKJC data: {odds_types=}")
-    body = """
-      query matchList($startIndex: Int, $endIndex: Int,$startDate: String, $endDate: String, $matchIds: [String], $tournIds: [String], $fbOddsTypes: [FBOddsType]!, $fbOddsTypesM: [FBOddsType]!, $inplayOnly: Boolean, $featuredMatchesOnly: Boolean, $frontEndIds: [String], $earlySettlementOnly: Boolean, $showAllMatch: Boolean) {
-        matches(startIndex: $startIndex,endIndex: $endIndex, startDate: $startDate, endDate: $endDate, matchIds: $matchIds, tournIds: $tournIds, fbOddsTypes: $fbOddsTypesM, inplayOnly: $inplayOnly, featuredMatchesOnly: $featuredMatchesOnly, frontEndIds: $frontEndIds, earlySettlementOnly: $earlySettlementOnly, showAllMatch: $showAllMatch) {
-          id
-          frontEndId
-          matchDate
-          kickOffTime
-          status
-          updateAt
-          sequence
-          esIndicatorEnabled
-          homeTeam {
-            id
-            name_en
-            name_ch
-          }
-          awayTeam {
-            id
-            name_en
-            name_ch
-          }
-          tournament {
-            id
-            frontEndId
-            nameProfileId
-            isInteractiveServiceAvailable
-            code
-            name_en
-            name_ch
-          }
-          isInteractiveServiceAvailable
-          inplayDelay
-          venue {
-            code
-            name_en
-            name_ch
-          }
-          tvChannels {
-            code
-            name_en
-            name_ch
-          }
-          liveEvents {
-            id
-            code
-          }
-          featureStartTime
-          featureMatchSequence
-          poolInfo {
-            normalPools
-            inplayPools
-            sellingPools
-            ntsInfo
-            entInfo
-          }
-          runningResult {
-            homeScore
-            awayScore
-            corner
-          }
-          runningResultExtra {
-            homeScore
-            awayScore
-            corner
-          }
-          adminOperation {
-            remark {
-              typ
-            }
-          }
-          foPools(fbOddsTypes: $fbOddsTypes) {
-            id
-            status
-            oddsType
-            instNo
-            inplay
-            name_ch
-            name_en
-            updateAt
-            expectedSuspendDateTime
-            lines {
-              lineId
-              status
-              condition
-              main
-              combinations {
-                combId
-                str
-                status
-                offerEarlySettlement
-                currentOdds
-                selections {
-                  selId
-                  str
-                  name_ch
-                  name_en
-                }
-              }
-            }
-          }
-        }
-      }
-      """
-    response = requests.post(
-        url="https://info.cld.hkjc.com/graphql/base/",
+    response = SESSION.post(
+        url=URL,
         headers={"content-type": "application/json"},
         json={
-            "query": body,
+            "query": QUERY,
             "variables": {
                 "fbOddsTypes": odds_types,
                 "fbOddsTypesM": odds_types,
@@ -144,7 +164,3 @@ def get_hkjc_odds(odds_types: list[str]) -> dict:
     matches = response.json()["data"]["matches"]
     logging.info(f"Got HKJC data: {odds_types=}")
     return matches
-
-
-def get_current_timestamp():
-    return datetime.now().isoformat()
@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+from gcp import storage
+from main import get_hkjc_odds
+from snapshot import Snapshot
+
+# Seconds before the next kick-off and the seconds to wait between polls
+POLL_INTERVALS = [[15 * 60, 30], [60 * 60, 60], [6 * 60 * 60, 300]]
+MAX_POLL_INTERVAL = 900
+ROLL_INTERVAL = 600
+
+
+@dataclass
+class RollingFile:
+    bucket_name: str
+    roll_interval: timedelta
+    rows: list[dict] = field(default_factory=list)
+    started_at: datetime | None = None
+
+    def append(self, matches: list[dict], timestamp: datetime):
+        if self.started_at is None:
+            self.started_at = timestamp
+        self.rows.extend(
+            match | {"_SNAPSHOT_TIMESTAMP": timestamp.isoformat()} for match in matches
+        )
+
+    def is_due(self, timestamp: datetime) -> bool:
+        return (
+            self.started_at is not None
+            and timestamp - self.started_at >= self.roll_interval
+        )
+
+    def flush(self):
+        if not self.rows:
+            self.started_at = None
+            return
+
+        # Rows stay buffered and go out with the next flush if the upload fails
+        try:
+            storage.upload_json_to_bucket(
+                data=self.rows,
+                blob_name="odds.json",
+                bucket_name=self.bucket_name,
+                hive_partitioning={"_TIMESTAMP": self.started_at.isoformat()},
+            )
+        except storage.GCSUploadError:
+            return
+        self.rows, self.started_at = [], None
+
+
+def get_poll_interval(
+    matches: list[dict], now: datetime, intervals: list[list[int]]
+) -> int:
+    kick_offs = [
+        datetime.fromisoformat(match["kickOffTime"])
+        for match in matches
+        if match["status"] == "PREEVENT"
+    ]
+    upcoming = [kick_off - now for kick_off in kick_offs if kick_off > now]
+    if not upcoming:
+        return MAX_POLL_INTERVAL
+
+    seconds = min(upcoming).total_seconds()
+    for before, interval in sorted(intervals):
+        if seconds <= before:
+            return interval
+    return MAX_POLL_INTERVAL
+
+
+def get_utc_now() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+
+def poll(
+    bucket_name: str,
+    odds_types: list[str],
+    intervals: list[list[int]] = POLL_INTERVALS,
+    roll_interval: int = ROLL_INTERVAL,
+):
+    # The HTTP session and storage client are created once at import, and the
+    # last snapshot is kept in memory instead of in the bucket
+    snapshot = Snapshot()
+    rolling_file = RollingFile(bucket_name, timedelta(seconds=roll_interval))
+    interval = MAX_POLL_INTERVAL
+    try:
+        while True:
+            now = get_utc_now()
+            timestamp = now.replace(tzinfo=None)
+            try:
+                matches = get_hkjc_odds(odds_types)
+            except requests.exceptions.RequestException as error:
+                logging.warning(f"Get HKJC odds failed: {error=}")
+                time.sleep(interval)
+                continue
+
+            # A keyframe starts a new file so odds_today.sql finds it by partition
+            changed = snapshot.diff(matches, timestamp)
+            if snapshot.keyframe_at == timestamp.isoformat():
+                rolling_file.flush()
+            rolling_file.append(changed, timestamp)
+            if rolling_file.is_due(timestamp):
+                rolling_file.flush()
+
+            interval = get_poll_interval(matches, now, intervals)
+            elapsed = (get_utc_now() - now).total_seconds()
+            time.sleep(max(interval - elapsed, 0))
+    finally:
+        rolling_file.flush()
+
+
+if __name__ == "__main__":
+    poll(
+        bucket_name=os.environ["BUCKET_NAME"],
+        odds_types=json.loads(os.environ["ODDS_TYPES"]),
+        intervals=json.loads(
+            os.environ.get("POLL_INTERVALS", json.dumps(POLL_INTERVALS))
+        ),
+        roll_interval=int(os.environ.get("ROLL_INTERVAL", ROLL_INTERVAL)),
+    )
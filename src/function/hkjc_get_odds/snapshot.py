@@ -0,0 +1,64 @@
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+
+# odds_today.sql looks back this far for the latest row of every match
+KEYFRAME_INTERVAL = timedelta(hours=1)
+# Bumped when odds_today.sql needs rows a saved snapshot never wrote, so the
+# first run after a deploy starts over with a keyframe
+SNAPSHOT_VERSION = 2
+
+
+@dataclass
+class Snapshot:
+    fingerprints: dict[str, str] = field(default_factory=dict)
+    keyframe_at: str | None = None
+    version: int = SNAPSHOT_VERSION
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "Snapshot":
+        if not data or data.get("version") != SNAPSHOT_VERSION:
+            return cls()
+        return cls(**data)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def is_keyframe_due(self, timestamp: datetime) -> bool:
+        if self.keyframe_at is None:
+            return True
+        return timestamp - datetime.fromisoformat(self.keyframe_at) >= KEYFRAME_INTERVAL
+
+    def diff(self, matches: list[dict], timestamp: datetime) -> list[dict]:
+        # Only matches that changed since the last snapshot are emitted, with
+        # every match again once a keyframe is due or a match leaves the feed,
+        # as odds_today.sql keeps only the matches of the newest keyframe
+        fingerprints = {match["id"]: get_fingerprint(match) for match in matches}
+        if self.is_keyframe_due(timestamp) or self.fingerprints.keys() - fingerprints:
+            changed = [match | {"_KEYFRAME": True} for match in matches]
+            self.keyframe_at = timestamp.isoformat()
+        else:
+            changed = [
+                match
+                for match in matches
+                if self.fingerprints.get(match["id"]) != fingerprints[match["id"]]
+            ]
+        self.fingerprints = fingerprints
+        return changed
+
+
+def get_fingerprint(match: dict) -> str:
+    # The fields odds_clean.sql reads, the rest of the payload rarely moves
+    odds = [
+        [
+            pool["oddsType"],
+            line["condition"],
+            line["status"],
+            [[c["str"], c["currentOdds"]] for c in line["combinations"]],
+        ]
+        for pool in match["foPools"]
+        for line in pool["lines"]
+    ]
+    data = json.dumps([match["status"], match["updateAt"], odds])
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
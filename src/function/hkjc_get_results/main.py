@@ -1,112 +1,167 @@
 import logging
 import os
-from datetime import datetime, timedelta
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 
 import functions_framework
 import pytz
 import requests
+from cloudevents.http.event import CloudEvent
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
 from gcp import storage
 from gcp.logging import setup_logging
+from gcp.util import decode_message
 
 setup_logging()
 
 
+URL = "https://info.cld.hkjc.com/graphql/base/"
+MAX_CONCURRENCY = 8
+PAGE_SIZE = 20
+QUERY = """
+query matchResults($startDate: String, $endDate: String, $startIndex: Int,$endIndex: Int,$teamId: String) {
+  timeOffset {
+    fb
+  }
+  matchNumByDate(startDate: $startDate, endDate: $endDate, teamId: $teamId) {
+    total
+  }
+  matches: matchResult(startDate: $startDate, endDate: $endDate, startIndex: $startIndex,endIndex: $endIndex, teamId: $teamId) {
+    id
+    status
+    frontEndId
+    matchDayOfWeek
+    matchNumber
+    matchDate
+    kickOffTime
+    sequence
+    homeTeam {
+      id
+      name_en
+      name_ch
+    }
+    awayTeam {
+      id
+      name_en
+      name_ch
+    }
+    tournament {
+      code
+      name_en
+      name_ch      
+    }
+    results {
+      homeResult
+      awayResult
+      resultConfirmType
+      payoutConfirmed
+      stageId
+      resultType
+      sequence
+    }
+    poolInfo {
+      payoutRefundPools
+      refundPools
+      ntsInfo
+      entInfo
+      definedPools
+    }
+  }
+}
+  """
+
+
 @functions_framework.cloud_event
-def main(_):
-    date = get_yesterday()
-
-    storage.upload_json_to_bucket(
-        data=get_hkjc_result(date),
-        blob_name="results.json",
-        bucket_name=os.environ["BUCKET_NAME"],
-        hive_partitioning={"_DATE": date},
+def main(cloud_event: CloudEvent):
+    message = decode_message(cloud_event)
+    if isinstance(message, dict) and "start_date" in message:
+        start_date = message["start_date"]
+        end_date = message.get("end_date", start_date)
+    else:
+        start_date = end_date = get_yesterday()
+
+    results = defaultdict(list)
+    for result in get_hkjc_result(start_date, end_date):
+        results[result["matchDate"][:10]].append(result)
+
+    # Every date in the range is uploaded so empty days overwrite stale data
+    for _date in get_dates(start_date, end_date):
+        storage.upload_json_to_bucket(
+            data=results[_date],
+            blob_name="results.json",
+            bucket_name=os.environ["BUCKET_NAME"],
+            hive_partitioning={"_DATE": _date},
+        )
+
+
+def get_session() -> requests.Session:
+    # The query is read only, so failed posts are safe to retry
+    retry = Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["POST"],
     )
+    adapter = HTTPAdapter(pool_maxsize=MAX_CONCURRENCY, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
 
 
-def get_hkjc_result(date: str) -> list[dict]:
-    page_size = 20
-    page = 1
-    results = []
-
-    body = """
-    query matchResults($startDate: String, $endDate: String, $startIndex: Int,$endIndex: Int,$teamId: String) {
-      timeOffset {
-        fb
-      }
-      matchNumByDate(startDate: $startDate, endDate: $endDate, teamId: $teamId) {
-        total
-      }
-      matches: matchResult(startDate: $startDate, endDate: $endDate, startIndex: $startIndex,endIndex: $endIndex, teamId: $teamId) {
-        id
-        status
-        frontEndId
-        matchDayOfWeek
-        matchNumber
-        matchDate
-        kickOffTime
-        sequence
-        homeTeam {
-          id
-          name_en
-          name_ch
-        }
-        awayTeam {
-          id
-          name_en
-          name_ch
-        }
-        tournament {
-          code
-          name_en
-          name_ch      
-        }
-        results {
-          homeResult
-          awayResult
-          resultConfirmType
-          payoutConfirmed
-          stageId
-          resultType
-          sequence
-        }
-        poolInfo {
-          payoutRefundPools
-          refundPools
-          ntsInfo
-          entInfo
-          definedPools
-        }
-      }
-    }
-  """
-    while True:
-        logging.info(f"Getting HKJC result: {date=}, {page=}")
-
-        response = requests.post(
-            url="https://info.cld.hkjc.com/graphql/base/",
-            headers={"content-type": "application/json"},
-            json={
-                "query": body,
-                "variables": {
-                    "startDate": date,
-                    "endDate": date,
-                    "startIndex": (page - 1) * page_size + 1,
-                    "endIndex": page * page_size,
-                },
-            },
-            timeout=5,
+SESSION = get_session()
+
+
+def get_hkjc_result(start_date: str, end_date: str | None = None) -> list[dict]:
+    end_date = end_date or start_date
+
+    # The first window tells the total, the rest are fetched together. The
+    # windows are fixed up front so a total changing mid-fetch cannot loop.
+    first = get_page(start_date, end_date, 1)
+    total = first["matchNumByDate"]["total"]
+    start_indexes = range(PAGE_SIZE + 1, total + 1, PAGE_SIZE)
+    with ThreadPoolExecutor(MAX_CONCURRENCY) as executor:
+        pages = [first] + list(
+            executor.map(lambda i: get_page(start_date, end_date, i), start_indexes)
         )
-        response.raise_for_status()
-        data = response.json()["data"]
-        results.extend(data["matches"])
 
-        logging.info(f"Got HKJC result: {date=}, {page=}")
+    # Matches shifting between windows could show up twice
+    results = {}
+    for page in pages:
+        for result in page["matches"]:
+            results.setdefault(result["id"], result)
+    return list(results.values())
+
+
+def get_page(start_date: str, end_date: str, start_index: int) -> dict:
+    logging.info(f"Getting HKJC result: {start_date=}, {end_date=}, {start_index=}")
+    response = SESSION.post(
+        url=URL,
+        headers={"content-type": "application/json"},
+        json={
+            "query": QUERY,
+            "variables": {
+                "startDate": start_date,
+                "endDate": end_date,
+                "startIndex": start_index,
+                "endIndex": start_index + PAGE_SIZE - 1,
+            },
+        },
+        timeout=5,
+    )
+    response.raise_for_status()
+    logging.info(f"Got HKJC result: {start_date=}, {end_date=}, {start_index=}")
+    return response.json()["data"]
 
-        if len(results) == data["matchNumByDate"]["total"]:
-            return results
 
-        page += 1
+def get_dates(start_date: str, end_date: str) -> list[str]:
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    return [
+        (start + timedelta(days=i)).strftime("%Y-%m-%d")
+        for i in range((end - start).days + 1)
+    ]
 
 
 def get_yesterday():
@@ -11,7 +11,7 @@ from gcp.logging import setup_logging
 
 from gcp.util import decode_message
 from simulation import queries
-from simulation.tournaments import Tournament
+from simulation.tournaments import BATCH_SIZE, Tournament
 
 
 setup_logging()
@@ -47,8 +47,19 @@ def main(cloud_event: CloudEvent):
 
     rounds = config["rounds"]
     tournament.set_rounds(rounds)
-    tournament.simulate()
-    logging.info("Simulated: %s", league)
+    simulation = config.get("simulation", {})
+    tournament.simulate(
+        simulation.get("no_of_simulations", 1000),
+        tolerance=simulation.get("tolerance"),
+        batch_size=simulation.get("batch_size", BATCH_SIZE),
+        max_workers=int(os.environ.get("MAX_WORKERS", 1)),
+    )
+    logging.info(
+        "Simulated: %s (%d simulations, standard error %.4f)",
+        league,
+        tournament.no_of_simulations,
+        tournament.standard_error,
+    )
 
     storage.upload_json_to_bucket(
         tournament.result,
@@ -1,3 +1,9 @@
+from .accumulator import Accumulator
+from .batch import Batch
+from .fixtures import Fixtures
 from .match import Match
+from .scorelines import Scorelines
+from .tables import Tables
 from .tiebreaker import TieBreaker
+from .ties import Ties
 from .team import Team
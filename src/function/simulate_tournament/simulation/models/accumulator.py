@@ -0,0 +1,85 @@
+from dataclasses import astuple, dataclass
+
+import numpy as np
+
+from .results import standard_error
+from .table import Table
+from .tables import Tables
+from .team import Team
+
+
+@dataclass
+class Accumulator:
+    no_of_teams: int
+
+    def __post_init__(self):
+        self.simulations = 0
+        self.table = np.zeros((self.no_of_teams, 6), dtype=np.int64)
+        self.positions = np.zeros((self.no_of_teams, self.no_of_teams), dtype=np.int64)
+        self.rounds: dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_teams(cls, teams: list[Team], simulations: int) -> "Accumulator":
+        results = cls(len(teams))
+        results.simulations = simulations
+        for i, team in enumerate(teams):
+            results.table[i] = astuple(team.sim_table)
+            for position, count in team.sim_positions.items():
+                results.positions[i, int(position[1:]) - 1] = count
+            for _round, count in team.sim_rounds.items():
+                results.rounds.setdefault(_round, np.zeros(len(teams), dtype=np.int64))[
+                    i
+                ] = count
+        return results
+
+    def __add__(self, other: "Accumulator") -> "Accumulator":
+        if self.no_of_teams != other.no_of_teams:
+            raise ValueError
+        result = Accumulator(self.no_of_teams)
+        result.simulations = self.simulations + other.simulations
+        result.table = self.table + other.table
+        result.positions = self.positions + other.positions
+        for rounds in (self.rounds, other.rounds):
+            for name, counts in rounds.items():
+                result.rounds[name] = result.rounds.get(name, 0) + counts
+        return result
+
+    @property
+    def standard_error(self) -> float:
+        counts = [self.positions.ravel(), *self.rounds.values()]
+        return standard_error(np.concatenate(counts), self.simulations)
+
+    def log_sim_table(self, teams: np.ndarray, table: Tables):
+        size = len(table.wins)
+        self.table[teams] += np.stack(
+            [
+                table.wins[:, teams].sum(axis=0),
+                table.draws[:, teams].sum(axis=0),
+                table.losses[:, teams].sum(axis=0),
+                table.scored[:, teams].sum(axis=0),
+                table.conceded[:, teams].sum(axis=0),
+                table.correction[teams] * size,
+            ],
+            axis=-1,
+        )
+
+    def log_sim_positions(self, positions: np.ndarray, start: int = 1):
+        ranks = np.broadcast_to(
+            np.arange(positions.shape[1]) + start - 1, positions.shape
+        )
+        np.add.at(self.positions, (positions, ranks), 1)
+
+    def log_sim_rounds(self, _round: str, teams: np.ndarray):
+        counts = np.bincount(teams.ravel(), minlength=self.no_of_teams)
+        self.rounds[_round] = self.rounds.get(_round, 0) + counts
+
+    def log_teams(self, teams: list[Team]):
+        for i, team in enumerate(teams):
+            team.sim_table += Table(*self.table[i].tolist())
+            for position in np.flatnonzero(self.positions[i]).tolist():
+                team.sim_positions[f"_{position + 1}"] += int(
+                    self.positions[i, position]
+                )
+            for _round, counts in self.rounds.items():
+                if counts[i]:
+                    team.sim_rounds[_round] += int(counts[i])
@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .accumulator import Accumulator
+from .team import Team
+
+
+@dataclass
+class Batch:
+    teams: list[Team]
+    size: int
+    rng: np.random.Generator
+
+    def __post_init__(self):
+        self.index = {team: i for i, team in enumerate(self.teams)}
+        self.offence = np.array([team.offence for team in self.teams])
+        self.defence = np.array([team.defence for team in self.teams])
+        self.correction = np.array(
+            [team.table.correction for team in self.teams], dtype=np.int64
+        )
+        self.results = Accumulator(len(self.teams))
+        self.results.simulations = self.size
+
+    def team_ids(self, teams: list[Team]) -> np.ndarray:
+        return np.array([self.index[team] for team in teams], dtype=np.intp)
@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .match import Match
+from .scorelines import Scorelines
+from .team import Team
+
+
+@dataclass
+class Fixtures:
+    home_teams: np.ndarray
+    away_teams: np.ndarray
+    home_scores: np.ndarray
+    away_scores: np.ndarray
+    is_complete: np.ndarray
+
+    def __post_init__(self):
+        self._scorelines: dict[tuple[float, float], Scorelines] = {}
+
+    @classmethod
+    def from_matches(cls, matches: list[Match], index: dict[Team, int]) -> "Fixtures":
+        return cls(
+            home_teams=np.array([index[m.home_team] for m in matches], dtype=np.intp),
+            away_teams=np.array([index[m.away_team] for m in matches], dtype=np.intp),
+            home_scores=np.array([m.home_score for m in matches], dtype=np.int64),
+            away_scores=np.array([m.away_score for m in matches], dtype=np.int64),
+            is_complete=np.array([m.is_complete for m in matches], dtype=bool),
+        )
+
+    def __len__(self) -> int:
+        return len(self.home_teams)
+
+    def incidence(self, no_of_teams: int) -> tuple[np.ndarray, np.ndarray]:
+        home = np.zeros((len(self), no_of_teams))
+        away = np.zeros((len(self), no_of_teams))
+        home[np.arange(len(self)), self.home_teams] = 1
+        away[np.arange(len(self)), self.away_teams] = 1
+        return home, away
+
+    def expected_goals(
+        self,
+        avg_goal: float,
+        home_adv: float,
+        offence: np.ndarray,
+        defence: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        home_exp = (
+            avg_goal + home_adv + offence[self.home_teams] + defence[self.away_teams]
+        )
+        away_exp = (
+            avg_goal - home_adv + offence[self.away_teams] + defence[self.home_teams]
+        )
+        return np.maximum(home_exp, 0.2), np.maximum(away_exp, 0.2)
+
+    def scorelines(
+        self,
+        avg_goal: float,
+        home_adv: float,
+        offence: np.ndarray,
+        defence: np.ndarray,
+    ) -> Scorelines:
+        key = (avg_goal, home_adv)
+        if key not in self._scorelines:
+            remaining = ~self.is_complete
+            home_exp, away_exp = self.expected_goals(
+                avg_goal, home_adv, offence, defence
+            )
+            self._scorelines[key] = Scorelines(home_exp[remaining], away_exp[remaining])
+        return self._scorelines[key]
+
+    def simulate(
+        self,
+        rng: np.random.Generator,
+        size: int,
+        avg_goal: float,
+        home_adv: float,
+        offence: np.ndarray,
+        defence: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        home_scores = np.tile(self.home_scores, (size, 1))
+        away_scores = np.tile(self.away_scores, (size, 1))
+
+        remaining = ~self.is_complete
+        if not remaining.any():
+            return home_scores, away_scores
+
+        scorelines = self.scorelines(avg_goal, home_adv, offence, defence)
+        home_scores[:, remaining], away_scores[:, remaining] = scorelines.sample(
+            rng, size
+        )
+        return home_scores, away_scores
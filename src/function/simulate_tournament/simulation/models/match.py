@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import random
 import numpy as np
@@ -6,19 +6,20 @@ import numpy as np
 from .team import Team
 
 
-@dataclass
+@dataclass(slots=True)
 class Match:
     home_team: Team
     away_team: Team
     status: str = "incomplete"
     home_score: int = 0
     away_score: int = 0
+    _baseline: tuple[str, int, int] = field(init=False, repr=False, compare=False)
+    _winning_team: Team | None = field(
+        init=False, default=None, repr=False, compare=False
+    )
 
     def __post_init__(self):
-        self._status = self.status
-        self._home_score = self.home_score
-        self._away_score = self.away_score
-        self._winning_team = None
+        self._baseline = (self.status, self.home_score, self.away_score)
 
     def __repr__(self) -> str:
         if self.is_complete:
@@ -75,13 +76,14 @@ class Match:
         self.status = "complete"
 
     def simulate(self, avg_goal: float, home_adv: float, is_cup: bool = False):
+        # winning_team is only known once complete, so compare the scores
         self._simulate(avg_goal, home_adv)
-        if self.winning_team or not is_cup:
+        if self.home_score != self.away_score or not is_cup:
             self.set_status_complete()
             return
 
         self._simulate(avg_goal, home_adv, extra_time=True)
-        if self.winning_team:
+        if self.home_score != self.away_score:
             self.set_status_complete()
             return
 
@@ -112,7 +114,5 @@ class Match:
         away_table.conceded += self.home_score
 
     def reset(self):
-        self.status = self._status
-        self.home_score = self._home_score
-        self.away_score = self._away_score
+        self.status, self.home_score, self.away_score = self._baseline
         self._winning_team = None
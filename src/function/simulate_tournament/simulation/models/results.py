@@ -1,11 +1,23 @@
 from collections import defaultdict
 
+import numpy as np
+
 
 class Results(defaultdict):
     def __init__(self):
         super().__init__(int)
 
+    def __reduce__(self):
+        return (Results, (), None, None, iter(self.items()))
+
     def __truediv__(self, other):
         for key in self:
             self[key] /= other
         return self
+
+
+def standard_error(counts: list[int], simulations: int) -> float:
+    probabilities = np.asarray(counts, dtype=float) / simulations
+    return float(
+        np.sqrt(probabilities * (1 - probabilities) / simulations).max(initial=0)
+    )
@@ -0,0 +1,44 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+MAX_GOALS = 15
+
+
+def poisson_pmf(expected_goals: np.ndarray, max_goals: int = MAX_GOALS) -> np.ndarray:
+    pmf = np.empty((len(expected_goals), max_goals + 1))
+    pmf[:, 0] = np.exp(-expected_goals)
+    for goals in range(1, max_goals + 1):
+        pmf[:, goals] = pmf[:, goals - 1] * expected_goals / goals
+    pmf[:, max_goals] = 1 - pmf[:, :max_goals].sum(axis=1)
+    return pmf
+
+
+@dataclass
+class Scorelines:
+    home_exp: np.ndarray
+    away_exp: np.ndarray
+    max_goals: int = MAX_GOALS
+
+    def __post_init__(self):
+        home_pmf = poisson_pmf(self.home_exp, self.max_goals)
+        away_pmf = poisson_pmf(self.away_exp, self.max_goals)
+        self.pmf = (home_pmf[:, :, None] * away_pmf[:, None, :]).reshape(len(self), -1)
+
+        # Offset each fixture's CDF by its index so one searchsorted covers all
+        cdf = self.pmf.cumsum(axis=1)
+        cdf /= cdf[:, -1:]
+        self._offsets = np.arange(len(self))
+        self._cdf = (cdf + self._offsets[:, None]).ravel()
+
+    def __len__(self) -> int:
+        return len(self.home_exp)
+
+    def sample(
+        self, rng: np.random.Generator, size: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        cells = self.pmf.shape[1]
+        uniform = rng.random((size, len(self))) + self._offsets
+        index = np.searchsorted(self._cdf, uniform, side="right")
+        index = np.minimum(index - self._offsets * cells, cells - 1)
+        return np.divmod(index, self.max_goals + 1)
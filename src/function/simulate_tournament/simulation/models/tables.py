@@ -0,0 +1,50 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .fixtures import Fixtures
+
+
+@dataclass
+class Tables:
+    wins: np.ndarray
+    draws: np.ndarray
+    losses: np.ndarray
+    scored: np.ndarray
+    conceded: np.ndarray
+    correction: np.ndarray
+
+    @classmethod
+    def from_scores(
+        cls,
+        fixtures: Fixtures,
+        home_scores: np.ndarray,
+        away_scores: np.ndarray,
+        correction: np.ndarray,
+        mask: np.ndarray | None = None,
+    ) -> "Tables":
+        home, away = fixtures.incidence(len(correction))
+        if mask is None:
+            mask = np.ones_like(home_scores, dtype=bool)
+        home_scores = home_scores * mask
+        away_scores = away_scores * mask
+
+        home_wins = (home_scores > away_scores) & mask
+        away_wins = (home_scores < away_scores) & mask
+        draws = (home_scores == away_scores) & mask
+        return cls(
+            wins=(home_wins @ home + away_wins @ away).astype(np.int64),
+            draws=(draws @ home + draws @ away).astype(np.int64),
+            losses=(away_wins @ home + home_wins @ away).astype(np.int64),
+            scored=(home_scores @ home + away_scores @ away).astype(np.int64),
+            conceded=(away_scores @ home + home_scores @ away).astype(np.int64),
+            correction=correction,
+        )
+
+    @property
+    def points(self) -> np.ndarray:
+        return self.wins * 3 + self.draws + self.correction
+
+    @property
+    def goal_diff(self) -> np.ndarray:
+        return self.scored - self.conceded
@@ -1,27 +1,26 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from .results import Results
 from .table import Table
 
 
-@dataclass
+@dataclass(slots=True)
 class Team:
     name: str
     offence: float
     defence: float
-
-    def __post_init__(self):
-        self.table = Table()
-        self.h2h_table = Table()
-        self.sim_table = Table()
-        self.sim_positions = Results()
-        self.sim_rounds = Results()
+    table: Table = field(init=False, default_factory=Table)
+    h2h_table: Table = field(init=False, default_factory=Table)
+    sim_table: Table = field(init=False, default_factory=Table)
+    sim_positions: Results = field(init=False, default_factory=Results)
+    sim_rounds: Results = field(init=False, default_factory=Results)
 
     def __repr__(self) -> str:
         return str(self.name)
 
     def __eq__(self, other: "Team") -> bool:
-        return other and self.name == other.name
+        # Teams are shared objects, so most lookups end at the identity check
+        return self is other or (other and self.name == other.name)
 
     def __gt__(self, other: "Team") -> bool:
         return self.name > other.name
@@ -44,3 +43,8 @@ class Team:
     def reset(self):
         self.table.reset()
         self.h2h_table.reset()
+
+    def reset_sim(self):
+        self.sim_table = Table()
+        self.sim_positions = Results()
+        self.sim_rounds = Results()
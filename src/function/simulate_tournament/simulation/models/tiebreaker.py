@@ -1,3 +1,7 @@
+from collections import defaultdict
+from itertools import permutations
+
+from .match import Match
 from .team import Team
 
 
@@ -16,3 +20,34 @@ class TieBreaker:
     @staticmethod
     def goal_diff(team: Team) -> tuple:
         return (team.table.points, team.table.goal_diff, team.table.scored)
+
+    @staticmethod
+    def index(matches: list[Match]) -> dict[tuple[Team, Team], list[Match]]:
+        index = defaultdict(list)
+        for match in matches:
+            index[match.teams].append(match)
+        return index
+
+    @classmethod
+    def rank(
+        cls,
+        teams: list[Team],
+        index: dict[tuple[Team, Team], list[Match]] | None = None,
+        extra: dict[Team, tuple] | None = None,
+    ) -> list[Team]:
+        # Without an index there is no h2h, otherwise only the mutual matches of
+        # teams level on points are looked up to build their mini-tables
+        key = cls.goal_diff if index is None else cls.h2h
+        if extra is not None:
+            key = lambda team, key=key: key(team) + extra[team]
+        if index is None:
+            return sorted(teams, key=key, reverse=True)
+
+        points = defaultdict(list)
+        for team in teams:
+            points[team.table.points].append(team)
+        for tied in points.values():
+            for home_team, away_team in permutations(tied, 2):
+                for match in index.get((home_team, away_team), []):
+                    match.log_teams_table(h2h=True)
+        return sorted(teams, key=key, reverse=True)
@@ -0,0 +1,125 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .match import Match
+from .team import Team
+
+
+@dataclass
+class Ties:
+    """Knockout ties of every simulation as (n_sims, n_ties) arrays.
+
+    The home team hosts the deciding match, the second leg of a two-legged tie.
+    The first leg goals are carried over from the home team's point of view.
+    """
+
+    home_teams: np.ndarray
+    away_teams: np.ndarray
+    home_scores: np.ndarray
+    away_scores: np.ndarray
+    is_complete: np.ndarray
+    home_carry: np.ndarray
+    away_carry: np.ndarray
+    is_first_leg_complete: np.ndarray
+
+    @classmethod
+    def from_series(
+        cls, series: list[list[Match]], index: dict[Team, int], leg: int = 2
+    ) -> "Ties":
+        rows = []
+        for matches in series:
+            if leg == 2:
+                # Same legs as Knockout.simulate picks for the aggregate
+                if matches[0].is_complete:
+                    first, second = matches[0], matches[1]
+                else:
+                    first, second = matches[1], matches[0]
+                carry = (first.away_score, first.home_score, first.is_complete)
+            else:
+                second = matches[0]
+                carry = (0, 0, True)
+            rows.append(
+                (
+                    index[second.home_team],
+                    index[second.away_team],
+                    second.home_score,
+                    second.away_score,
+                    second.is_complete,
+                    *carry,
+                )
+            )
+        columns = np.array(rows, dtype=np.int64).reshape(len(rows), 8).T[:, None, :]
+        return cls(
+            *columns[:4],
+            columns[4].astype(bool),
+            *columns[5:7],
+            columns[7].astype(bool),
+        )
+
+    @classmethod
+    def from_draw(cls, home_teams: np.ndarray, away_teams: np.ndarray) -> "Ties":
+        zeros = np.zeros(home_teams.shape, dtype=np.int64)
+        return cls(
+            home_teams,
+            away_teams,
+            zeros,
+            zeros,
+            np.zeros(home_teams.shape, dtype=bool),
+            zeros,
+            zeros,
+            np.zeros(home_teams.shape, dtype=bool),
+        )
+
+    @classmethod
+    def concatenate(cls, ties: list["Ties"], size: int) -> "Ties":
+        fields = zip(*(vars(tie).values() for tie in ties))
+        return cls(
+            *(
+                np.hstack([np.broadcast_to(f, (size, f.shape[1])) for f in field])
+                for field in fields
+            )
+        )
+
+    @property
+    def teams(self) -> np.ndarray:
+        return np.concatenate([self.home_teams.ravel(), self.away_teams.ravel()])
+
+    def simulate(
+        self,
+        rng: np.random.Generator,
+        avg_goal: float,
+        home_adv: float,
+        offence: np.ndarray,
+        defence: np.ndarray,
+        leg: int = 2,
+    ) -> np.ndarray:
+        home, away = self.home_teams, self.away_teams
+        home_exp = avg_goal + home_adv + offence[home] + defence[away]
+        away_exp = avg_goal - home_adv + offence[away] + defence[home]
+
+        # The first leg is played with the teams the other way round
+        home_scores, away_scores = self.home_carry.copy(), self.away_carry.copy()
+        if leg == 2:
+            first_leg = ~self.is_first_leg_complete
+            first_home_exp = avg_goal + home_adv + offence[away] + defence[home]
+            first_away_exp = avg_goal - home_adv + offence[home] + defence[away]
+            home_scores += rng.poisson(np.maximum(first_away_exp, 0.2)) * first_leg
+            away_scores += rng.poisson(np.maximum(first_home_exp, 0.2)) * first_leg
+
+        home_scores += self.home_scores
+        away_scores += self.away_scores
+        remaining = ~(self.is_complete & self.is_first_leg_complete)
+        home_scores += rng.poisson(np.maximum(home_exp, 0.2)) * remaining
+        away_scores += rng.poisson(np.maximum(away_exp, 0.2)) * remaining
+
+        # Extra time at a third of the expected goals, then a coin toss
+        extra_time = remaining & (home_scores == away_scores)
+        home_scores += rng.poisson(np.maximum(home_exp / 3, 0.2)) * extra_time
+        away_scores += rng.poisson(np.maximum(away_exp / 3, 0.2)) * extra_time
+        penalties = remaining & (home_scores == away_scores)
+        home_wins = (home_scores > away_scores) | (
+            penalties & (rng.random(home.shape) < 0.5)
+        )
+        away_wins = (away_scores > home_scores) | (penalties & ~home_wins)
+        return np.where(home_wins, home, np.where(away_wins, away, -1))
@@ -2,5 +2,6 @@ from .groups import Groups
 from .knockout import Knockout
 from .rounds import Round
 from .season import Season
-from .tournament import Tournament
+from .swiss import Swiss
+from .tournament import BATCH_SIZE, Tournament
 from .winner import Winner
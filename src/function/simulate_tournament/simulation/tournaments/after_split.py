@@ -1,4 +1,3 @@
-from collections import defaultdict
 from dataclasses import dataclass
 from functools import partial
 from itertools import combinations, permutations
@@ -20,6 +19,8 @@ class AfterSplit:
         self.teams: list[Team] = []
         self.matches = self.matches or []
         self.advance_to = None
+        self._index: dict[tuple[Team, Team], list[Match]] | None = None
+        self._positions: list[Team] | None = None
 
     @property
     def scheduling(self):
@@ -41,29 +42,14 @@ class AfterSplit:
             return 0
         return self.home_adv
 
-    @property
-    def tiebreaker(self):
-        return TieBreaker.h2h if self.h2h else TieBreaker.goal_diff
-
     @property
     def positions(self) -> list[Team]:
-        points = defaultdict(list)
-        for team in self.teams:
-            points[team.table.points].append(team)
-
-        if self.h2h:
-            for teams in points.values():
-                if len(teams) < 2:
-                    continue
-                for match in self.matches:
-                    if match.home_team in teams and match.away_team in teams:
-                        match.log_teams_table(h2h=True)
-
-        return sorted(
-            self.teams,
-            key=self.tiebreaker,
-            reverse=True,
-        )
+        # Ranked once per simulation, h2h mini-tables would be counted again
+        if self._positions is None:
+            if self.h2h and self._index is None:
+                self._index = TieBreaker.index(self.matches)
+            self._positions = TieBreaker.rank(self.teams, self._index)
+        return self._positions
 
     def add_teams(self, teams: list[Team]):
         self.teams.extend(teams)
@@ -90,3 +76,5 @@ class AfterSplit:
             team.reset()
         self.teams = []
         self.matches = []
+        self._index = None
+        self._positions = None
@@ -18,6 +18,8 @@ class BeforeSplit:
 
     def __post_init__(self):
         self.matches = self.matches or self.scheduling(self.teams)
+        self._index: dict[tuple[Team, Team], list[Match]] | None = None
+        self._positions: list[Team] | None = None
 
     @property
     def scheduling(self):
@@ -33,29 +35,14 @@ class BeforeSplit:
             return 0
         return self.home_adv
 
-    @property
-    def tiebreaker(self):
-        return TieBreaker.h2h if self.h2h else TieBreaker.goal_diff
-
     @property
     def positions(self) -> list[Team]:
-        points = defaultdict(list)
-        for team in self.teams:
-            points[team.table.points].append(team)
-
-        if self.h2h:
-            for teams in points.values():
-                if len(teams) < 2:
-                    continue
-                for match in self.matches:
-                    if match.home_team in teams and match.away_team in teams:
-                        match.log_teams_table(h2h=True)
-
-        return sorted(
-            self.teams,
-            key=self.tiebreaker,
-            reverse=True,
-        )
+        # Ranked once per simulation, h2h mini-tables would be counted again
+        if self._positions is None:
+            if self.h2h and self._index is None:
+                self._index = TieBreaker.index(self.matches)
+            self._positions = TieBreaker.rank(self.teams, self._index)
+        return self._positions
 
     def simulate(self):
         for match in self.matches:
@@ -73,5 +60,6 @@ class BeforeSplit:
         return teams
 
     def reset(self):
+        self._positions = None
         for match in self.matches:
             match.reset()
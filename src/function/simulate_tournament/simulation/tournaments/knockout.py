@@ -2,7 +2,9 @@ import random
 from collections import defaultdict
 from dataclasses import dataclass
 
-from simulation.models import Match, Team
+import numpy as np
+
+from simulation.models import Batch, Match, Team, Ties
 
 
 @dataclass
@@ -23,6 +25,7 @@ class Knockout:
         self.matches = self.matches or []
         self.winning_teams = self.winning_teams or set()
         self._winning_teams = self.winning_teams.copy()
+        self._ties: Ties | None = None
 
     @property
     def _home_adv(self):
@@ -30,11 +33,14 @@ class Knockout:
             return 0
         return self.home_adv
 
+    @property
+    def round_name(self) -> str:
+        return self.name.lower().replace(" ", "_").replace("-", "_")
+
     def add_teams(self, teams: list[Team]):
-        name = self.name.lower().replace(" ", "_").replace("-", "_")
         self.teams.extend(teams)
         for team in teams:
-            team.log_sim_rounds(name)
+            team.log_sim_rounds(self.round_name)
 
     @staticmethod
     def draw_series(
@@ -78,6 +84,74 @@ class Knockout:
             if agg.winning_team:
                 self.winning_teams.add(agg.winning_team)
 
+    def take_per_simulation(
+        self, teams: np.ndarray, mask: np.ndarray, what: str
+    ) -> np.ndarray:
+        # Every simulation must pick as many teams to keep one rectangular array
+        counts = mask.sum(axis=1)
+        if (counts != counts[0]).any():
+            raise ValueError(
+                f"Cannot simulate {self.name}: {what} differ between simulations "
+                f"({sorted(set(counts.tolist()))})"
+            )
+        order = np.argsort(~mask, axis=1, kind="stable")[:, : counts[0]]
+        return np.take_along_axis(teams, order, axis=1)
+
+    def draw_batch(self, batch: Batch, teams: np.ndarray, drawn: np.ndarray) -> Ties:
+        # Entrants without a scheduled tie are shuffled in every simulation at
+        # once and paired off in order
+        undrawn = self.take_per_simulation(
+            teams, ~np.isin(teams, drawn), "undrawn teams"
+        )
+        if undrawn.shape[1] % 2:
+            raise ValueError(
+                f"Cannot draw {self.name}: {undrawn.shape[1]} undrawn teams"
+            )
+
+        pairs = batch.rng.permuted(undrawn, axis=1)
+        return Ties.from_draw(pairs[:, 0::2], pairs[:, 1::2])
+
+    def simulate_batch(
+        self, batch: Batch, teams: np.ndarray | None = None
+    ) -> dict[str, np.ndarray]:
+        if teams is None:
+            teams = np.zeros((batch.size, 0), dtype=np.intp)
+        batch.results.log_sim_rounds(self.round_name, teams)
+
+        if self._ties is None:
+            series = self.draw_series(set(), self.matches, self.leg).values()
+            self._ties = Ties.from_series(list(series), batch.index, self.leg)
+        drawn = self._ties.teams
+        ties = Ties.concatenate(
+            [self._ties, self.draw_batch(batch, teams, drawn)], batch.size
+        )
+        winners = ties.simulate(
+            batch.rng,
+            self.avg_goal,
+            self._home_adv,
+            batch.offence,
+            batch.defence,
+            self.leg,
+        )
+
+        # Teams already through to the next round win their tie whatever the
+        # simulation says, a tie settled without a winner is left out
+        known = batch.team_ids(list(self._winning_teams))
+        winners = np.where(np.isin(ties.home_teams, known), ties.home_teams, winners)
+        winners = np.where(np.isin(ties.away_teams, known), ties.away_teams, winners)
+        winners = winners[:, (winners >= 0).all(axis=0)]
+
+        # Known winners in no tie of a simulation go through on a bye
+        is_bye = ~np.isin(known, drawn) & ~(teams[:, :, None] == known).any(axis=1)
+        byes = self.take_per_simulation(
+            np.broadcast_to(known, is_bye.shape), is_bye, "byes"
+        )
+        winners = np.hstack([winners, byes])
+
+        if not self.advance_to:
+            return {}
+        return {self.advance_to: winners}
+
     @property
     def advanced_teams(self) -> dict[str, list[Team]]:
         return {self.advance_to: list(self.winning_teams)}
@@ -1,7 +1,9 @@
 from collections import defaultdict
 from dataclasses import dataclass
 
-from simulation.models import Team, TieBreaker, Match
+import numpy as np
+
+from simulation.models import Batch, Fixtures, Match, Tables, Team, TieBreaker
 
 
 @dataclass
@@ -11,38 +13,28 @@ class Season:
     home_adv: float
     matches: list[Match]
     h2h: bool = False
-    leg: int = 2
+    leg: int | str = 2
     advance_to: str | dict[str, int] | None = None
 
+    def __post_init__(self):
+        self._fixtures: Fixtures | None = None
+        self._index: dict[tuple[Team, Team], list[Match]] | None = None
+        self._positions: list[Team] | None = None
+
     @property
     def _home_adv(self):
         if self.leg == 1:
             return 0
         return self.home_adv
 
-    @property
-    def tiebreaker(self):
-        return TieBreaker.h2h if self.h2h else TieBreaker.goal_diff
-
     @property
     def positions(self) -> list[Team]:
-        points = defaultdict(list)
-        for team in self.teams:
-            points[team.table.points].append(team)
-
-        if self.h2h:
-            for teams in points.values():
-                if len(teams) < 2:
-                    continue
-                for match in self.matches:
-                    if match.home_team in teams and match.away_team in teams:
-                        match.log_teams_table(h2h=True)
-
-        return sorted(
-            self.teams,
-            key=self.tiebreaker,
-            reverse=True,
-        )
+        # Ranked once per simulation, h2h mini-tables would be counted again
+        if self._positions is None:
+            if self.h2h and self._index is None:
+                self._index = TieBreaker.index(self.matches)
+            self._positions = TieBreaker.rank(self.teams, self._index)
+        return self._positions
 
     def simulate(self):
         for match in self.matches:
@@ -54,6 +46,76 @@ class Season:
             team.log_sim_table()
             team.log_sim_positions(position)
 
+    def sort_keys(
+        self,
+        table: Tables,
+        fixtures: Fixtures,
+        home_scores: np.ndarray,
+        away_scores: np.ndarray,
+    ) -> tuple[np.ndarray, ...]:
+        if self.h2h:
+            points = table.points
+            tied = points[:, fixtures.home_teams] == points[:, fixtures.away_teams]
+            h2h_table = Tables.from_scores(
+                fixtures,
+                home_scores,
+                away_scores,
+                np.zeros_like(table.correction),
+                mask=tied,
+            )
+            return (
+                points,
+                h2h_table.points,
+                h2h_table.goal_diff,
+                h2h_table.scored,
+                table.goal_diff,
+                table.scored,
+            )
+        return (table.points, table.goal_diff, table.scored)
+
+    def rank_batch(
+        self,
+        teams: np.ndarray,
+        table: Tables,
+        fixtures: Fixtures,
+        home_scores: np.ndarray,
+        away_scores: np.ndarray,
+    ) -> np.ndarray:
+        keys = self.sort_keys(table, fixtures, home_scores, away_scores)
+
+        # One stable sort over every simulation, the first key is the primary
+        # one and teams still level keep their order, as sorted() would
+        order = np.lexsort([-key[:, teams] for key in reversed(keys)], axis=-1)
+        return teams[order]
+
+    def simulate_batch(
+        self, batch: Batch, teams: np.ndarray | None = None
+    ) -> dict[str, np.ndarray]:
+        if self._fixtures is None:
+            self._fixtures = Fixtures.from_matches(self.matches, batch.index)
+        fixtures = self._fixtures
+        home_scores, away_scores = fixtures.simulate(
+            batch.rng,
+            batch.size,
+            self.avg_goal,
+            self._home_adv,
+            batch.offence,
+            batch.defence,
+        )
+        table = Tables.from_scores(fixtures, home_scores, away_scores, batch.correction)
+        team_ids = batch.team_ids(self.teams)
+        ranking = self.rank_batch(team_ids, table, fixtures, home_scores, away_scores)
+
+        batch.results.log_sim_table(team_ids, table)
+        batch.results.log_sim_positions(ranking)
+
+        if not self.advance_to:
+            return {}
+        return {
+            name: ranking[:, positions["start"] - 1 : positions["end"]]
+            for name, positions in self.advance_to.items()
+        }
+
     @property
     def advanced_teams(self) -> list[Team]:
         if not self.advance_to:
@@ -67,6 +129,7 @@ class Season:
         return teams
 
     def reset(self):
+        self._positions = None
         for match in self.matches:
             match.reset()
         for team in self.teams:
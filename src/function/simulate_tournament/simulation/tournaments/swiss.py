@@ -0,0 +1,63 @@
+from collections import defaultdict
+
+import numpy as np
+
+from simulation.models import Fixtures, Tables, Team, TieBreaker
+from .season import Season
+
+
+class Swiss(Season):
+    """League stage of an already drawn set of fixtures, each team playing a
+    different set of opponents, ranked with the UEFA tiebreakers."""
+
+    @property
+    def positions(self) -> list[Team]:
+        if self._positions is None:
+            if self.h2h and self._index is None:
+                self._index = TieBreaker.index(self.matches)
+            self._positions = TieBreaker.rank(
+                self.teams, self._index, self.tiebreakers()
+            )
+        return self._positions
+
+    def tiebreakers(self) -> dict[Team, tuple]:
+        # After points, goal difference and goals scored
+        away_scored = defaultdict(int)
+        away_wins = defaultdict(int)
+        opponents = defaultdict(list)
+        for match in self.matches:
+            away_scored[match.away_team] += match.away_score
+            away_wins[match.away_team] += match.away_score > match.home_score
+            opponents[match.home_team].append(match.away_team)
+            opponents[match.away_team].append(match.home_team)
+
+        return {
+            team: (
+                away_scored[team],
+                team.table.wins,
+                away_wins[team],
+                sum(opponent.table.points for opponent in opponents[team]),
+                sum(opponent.table.goal_diff for opponent in opponents[team]),
+                sum(opponent.table.scored for opponent in opponents[team]),
+            )
+            for team in self.teams
+        }
+
+    def sort_keys(
+        self,
+        table: Tables,
+        fixtures: Fixtures,
+        home_scores: np.ndarray,
+        away_scores: np.ndarray,
+    ) -> tuple[np.ndarray, ...]:
+        # Every pair of opponents is counted once per match between them
+        home, away = fixtures.incidence(len(table.correction))
+        opponents = home.T @ away + away.T @ home
+        return super().sort_keys(table, fixtures, home_scores, away_scores) + (
+            away_scores @ away,
+            table.wins,
+            (away_scores > home_scores) @ away,
+            table.points @ opponents,
+            table.goal_diff @ opponents,
+            table.scored @ opponents,
+        )
@@ -1,14 +1,23 @@
+import random
+from collections import defaultdict
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import asdict, dataclass
 
-from simulation.models import Match, Team
+import numpy as np
+
+from simulation.models import Accumulator, Batch, Match, Team
 from .after_split import AfterSplit
 from .before_split import BeforeSplit
 from .groups import Groups
 from .knockout import Knockout
 from .rounds import Round
 from .season import Season
+from .swiss import Swiss
 from .winner import Winner
 
+BATCH_SIZE = 2000
+
 
 @dataclass
 class Tournament:
@@ -20,6 +29,8 @@ class Tournament:
 
     def __post_init__(self):
         self.rounds: dict[str, Round] = {}
+        self.no_of_simulations = 0
+        self.standard_error = None
 
     def create_round(self, name: str, param: dict) -> Round:
         _format = param["format"]
@@ -55,8 +66,10 @@ class Tournament:
             )
 
         if _format == "Season":
-            return Season(
-                self.teams.values(),
+            # The league stage fixtures are drawn, not scheduled round robin
+            season = Swiss if param["leg"] == "Swiss" else Season
+            return season(
+                list(self.teams.values()),
                 self.avg_goal,
                 self.home_adv,
                 self.matches[name],
@@ -67,7 +80,7 @@ class Tournament:
 
         if _format == "BeforeSplit":
             return BeforeSplit(
-                self.teams.values(),
+                list(self.teams.values()),
                 self.avg_goal,
                 self.home_adv,
                 self.matches[name],
@@ -78,7 +91,7 @@ class Tournament:
 
         if _format == "AfterSplit":
             return AfterSplit(
-                self.teams.values(),
+                list(self.teams.values()),
                 self.avg_goal,
                 self.home_adv,
                 self.matches[name],
@@ -96,8 +109,37 @@ class Tournament:
         for name, param in rounds.items():
             self.rounds[name] = self.create_round(name, param)
 
-    def simulate(self, no_of_simulations: int = 1000) -> list[dict]:
-        for _ in range(no_of_simulations):
+    @property
+    def is_batchable(self) -> bool:
+        return all(
+            hasattr(round_obj, "simulate_batch") for round_obj in self.rounds.values()
+        )
+
+    @staticmethod
+    def batches(
+        no_of_simulations: int,
+        seed: int | None = None,
+        batch_size: int = BATCH_SIZE,
+    ) -> list[tuple[int, np.random.SeedSequence]]:
+        sizes = [batch_size] * (no_of_simulations // batch_size)
+        if no_of_simulations % batch_size:
+            sizes.append(no_of_simulations % batch_size)
+        return list(zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+
+    def simulate_batch(self, size: int, seed: np.random.SeedSequence) -> Accumulator:
+        batch = Batch(list(self.teams.values()), size, np.random.default_rng(seed))
+        entrants = defaultdict(list)
+        for name, round_obj in self.rounds.items():
+            teams = np.hstack(entrants.pop(name)) if name in entrants else None
+            advanced_teams = round_obj.simulate_batch(batch, teams)
+            for name, teams in advanced_teams.items():
+                entrants[name].append(teams)
+        return batch.results
+
+    def simulate_objects(self, size: int, seed: np.random.SeedSequence) -> Accumulator:
+        random.seed(int(seed.generate_state(1)[0]))
+        np.random.seed(seed.generate_state(4))
+        for _ in range(size):
             for name, round_obj in self.rounds.items():
                 round_obj.simulate()
 
@@ -107,10 +149,52 @@ class Tournament:
 
                 round_obj.reset()
 
+        teams = list(self.teams.values())
+        results = Accumulator.from_teams(teams, size)
+        for team in teams:
+            team.reset_sim()
+        return results
+
+    def run_batch(self, size: int, seed: np.random.SeedSequence) -> Accumulator:
+        if self.is_batchable:
+            return self.simulate_batch(size, seed)
+        return self.simulate_objects(size, seed)
+
+    def run_batches(
+        self, batches: list[tuple[int, np.random.SeedSequence]], max_workers: int = 1
+    ) -> Iterator[Accumulator]:
+        if max_workers == 1:
+            for size, seed in batches:
+                yield self.run_batch(size, seed)
+            return
+
+        with ProcessPoolExecutor(max_workers) as executor:
+            for i in range(0, len(batches), max_workers):
+                sizes, seeds = zip(*batches[i : i + max_workers])
+                yield from executor.map(self.run_batch, sizes, seeds)
+
+    def simulate(
+        self,
+        no_of_simulations: int = 1000,
+        seed: int | None = None,
+        tolerance: float | None = None,
+        batch_size: int = BATCH_SIZE,
+        max_workers: int = 1,
+    ):
+        batches = self.batches(no_of_simulations, seed, batch_size)
+        results = Accumulator(len(self.teams))
+        for batch_results in self.run_batches(batches, max_workers):
+            results += batch_results
+            if tolerance and results.standard_error <= tolerance:
+                break
+
+        results.log_teams(self.teams.values())
+        self.no_of_simulations = results.simulations
+        self.standard_error = results.standard_error
         for team in self.teams.values():
-            team.sim_table /= no_of_simulations
-            team.sim_rounds /= no_of_simulations
-            team.sim_positions /= no_of_simulations
+            team.sim_table /= self.no_of_simulations
+            team.sim_rounds /= self.no_of_simulations
+            team.sim_positions /= self.no_of_simulations
 
     @property
     def result(self):
@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 
-from simulation.models import Team
+import numpy as np
+
+from simulation.models import Batch, Team
 
 
 @dataclass
@@ -14,6 +16,15 @@ class Winner:
 
         teams[0].log_sim_rounds("winner")
 
+    def simulate_batch(
+        self, batch: Batch, teams: np.ndarray | None = None
+    ) -> dict[str, np.ndarray]:
+        if teams is None or teams.shape[1] != 1:
+            raise ValueError("Winner round must have exactly one team.")
+
+        batch.results.log_sim_rounds("winner", teams)
+        return {}
+
     @property
     def advanced_teams(self):
         return None
@@ -1,29 +1,101 @@
+import json
+import logging
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 import functions_framework
 from cloudevents.http.event import CloudEvent
+from google.api_core.exceptions import NotFound
 
 
 from gcp import storage
 from gcp.logging import setup_logging
 from gcp.util import decode_message
 from solver import queries
+from solver.backfill import History, backfill
 from solver.solver import solver
 
 setup_logging()
 
 
-@functions_framework.cloud_event
-def main(cloud_event: CloudEvent):
-    message = decode_message(cloud_event)
-    _type, latest_match_date = message["_TYPE"], message["latest_match_date"]
+def get_last_ratings(_type: str, last_run: int) -> dict[str, list[dict]] | None:
+    ratings = {}
+    for name in ["leagues", "teams"]:
+        blob_name = storage.get_directory(
+            f"{name}.json", {"_TYPE": _type, "_DATE_UNIX": last_run}
+        )
+        try:
+            data = storage.download_blob(blob_name, os.environ["BUCKET_NAME"])
+        except NotFound:
+            logging.warning(f"Last run not found: {blob_name=}")
+            return None
+        ratings[name] = [json.loads(line) for line in data.splitlines() if line]
+    return ratings
+
 
-    data = queries.get_matches_and_teams(_type, latest_match_date)
+def solve(data: dict, initial: dict | None, options: dict) -> dict:
+    return solver(
+        data["matches"], data["teams"], data["leagues"], initial=initial, **options
+    )
 
-    for name, data in solver(data["matches"], data["teams"], data["leagues"]).items():
-        storage.upload_json_to_bucket(
-            data,
-            blob_name=f"{name}.json",
-            bucket_name=os.environ["BUCKET_NAME"],
-            hive_partitioning={"_TYPE": _type, "_DATE_UNIX": latest_match_date},
+
+def upload_ratings(_type: str, results: dict[int, dict], max_workers: int = 8):
+    with ThreadPoolExecutor(max_workers) as executor:
+        uploads = [
+            executor.submit(
+                storage.upload_json_to_bucket,
+                data,
+                blob_name=f"{name}.json",
+                bucket_name=os.environ["BUCKET_NAME"],
+                hive_partitioning={"_TYPE": _type, "_DATE_UNIX": date_unix},
+            )
+            for date_unix, result in results.items()
+            for name, data in result.items()
+        ]
+    for upload in uploads:
+        upload.result()
+
+
+def solve_batch(messages: list[dict], max_workers: int = 1):
+    backends = json.loads(os.environ.get("SOLVER_BACKENDS", "{}"))
+    max_times = {message["_TYPE"]: message["latest_match_date"] for message in messages}
+    data = queries.get_matches_and_teams_batch(max_times)
+    initial = {
+        message["_TYPE"]: (
+            get_last_ratings(message["_TYPE"], message["last_run"])
+            if message.get("last_run")
+            else None
         )
+        for message in messages
+    }
+
+    args = (
+        [data[_type] for _type in max_times],
+        [initial[_type] for _type in max_times],
+        [backends.get(_type, {}) for _type in max_times],
+    )
+    if max_workers > 1 and len(max_times) > 1:
+        with ProcessPoolExecutor(min(max_workers, len(max_times))) as executor:
+            results = list(executor.map(solve, *args))
+    else:
+        results = list(map(solve, *args))
+
+    for (_type, latest_match_date), result in zip(max_times.items(), results):
+        upload_ratings(_type, {latest_match_date: result})
+
+
+def run_backfill(_type: str, start: int, end: int):
+    options = json.loads(os.environ.get("SOLVER_BACKENDS", "{}")).get(_type, {})
+    history = History.from_rows(queries.get_match_history(_type, start, end))
+    max_times = history.max_times(start, end)
+    logging.info(f"Backfilling ratings: {_type=} {len(max_times)=}")
+    upload_ratings(_type, backfill(history, max_times, **options))
+
+
+@functions_framework.cloud_event
+def main(cloud_event: CloudEvent):
+    message = decode_message(cloud_event)
+    if isinstance(message, dict) and "backfill" in message:
+        return run_backfill(message["_TYPE"], **message["backfill"])
+    messages = message if isinstance(message, list) else [message]
+    solve_batch(messages, max_workers=int(os.environ.get("MAX_WORKERS", 1)))
@@ -0,0 +1,71 @@
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from solver.models import Match
+from solver.queries import to_models
+from solver.solver import solver
+
+DAY = 24 * 60 * 60
+
+
+@dataclass
+class History:
+    matches: list[Match]
+    date_unix: np.ndarray
+    cut_off_year: np.ndarray
+
+    @classmethod
+    def from_rows(cls, data: list[dict]) -> "History":
+        return cls(
+            matches=to_models([match | {"recent": 0} for match in data])["matches"],
+            date_unix=np.array([match["date_unix"] for match in data], dtype=np.int64),
+            cut_off_year=np.array([match["cut_off_year"] for match in data]),
+        )
+
+    def max_times(self, start: int, end: int) -> np.ndarray:
+        # The last match of each day, as get_messages would have picked it
+        dates = np.sort(
+            self.date_unix[(self.date_unix >= start) & (self.date_unix <= end)]
+        )
+        last = np.append(np.diff(dates // DAY) > 0, True)
+        return dates[last]
+
+    def recent(self, max_time: int) -> np.ndarray:
+        # Same weights as get_matches.sql, zero outside the cut-off window
+        age = (max_time - self.date_unix) / (DAY * self.cut_off_year)
+        recent = 1 - age / 365 + np.maximum((1 - age / 25) * 0.25, 0)
+        return np.where((self.date_unix <= max_time) & (age < 365), recent, 0)
+
+    def as_of(self, max_time: int) -> dict:
+        recent = self.recent(max_time)
+        matches = [
+            replace(self.matches[i], recent=float(recent[i]))
+            for i in np.flatnonzero(recent).tolist()
+        ]
+        return {
+            "leagues": list(
+                {match.league.name: match.league for match in matches}.values()
+            ),
+            "teams": list(
+                {
+                    team.id: team
+                    for match in matches
+                    for team in (match.home_team, match.away_team)
+                }.values()
+            ),
+            "matches": matches,
+        }
+
+
+def backfill(
+    history: History, max_times: np.ndarray, initial: dict | None = None, **options
+) -> dict[int, dict[str, list[dict[str, float]]]]:
+    # Each day starts from the ratings of the day before
+    results = {}
+    for max_time in max_times.tolist():
+        data = history.as_of(max_time)
+        initial = results[max_time] = solver(
+            data["matches"], data["teams"], data["leagues"], initial=initial, **options
+        )
+    return results
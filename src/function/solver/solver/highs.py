@@ -0,0 +1,225 @@
+import logging
+
+import highspy
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+from solver.models import League, Match, Team
+
+
+class SolverError(Exception):
+    pass
+
+
+def residual_matrix(
+    matches: list[Match], teams: list[Team], leagues: list[League]
+) -> tuple[sparse.csr_array, np.ndarray]:
+    league_index = {league.name: i for i, league in enumerate(leagues)}
+    team_index = {team.id: i for i, team in enumerate(teams)}
+    n_leagues, n_teams, n_matches = len(leagues), len(teams), len(matches)
+
+    league = np.array([league_index[match.league.name] for match in matches])
+    home = np.array([team_index[match.home_team.id] for match in matches])
+    away = np.array([team_index[match.away_team.id] for match in matches])
+    recent = np.array([match.recent for match in matches], dtype=float)
+    home_score = np.array([match.home_score for match in matches], dtype=float)
+    away_score = np.array([match.away_score for match in matches], dtype=float)
+
+    # Columns: avg_goal, home_adv, offence, defence
+    home_adv, offence, defence = n_leagues, 2 * n_leagues, 2 * n_leagues + n_teams
+    home_rows = np.arange(n_matches)
+    away_rows = home_rows + n_matches
+    rows = np.concatenate([np.tile(home_rows, 4), np.tile(away_rows, 4)])
+    cols = np.concatenate(
+        [
+            league,
+            home_adv + league,
+            offence + home,
+            defence + away,
+            league,
+            home_adv + league,
+            offence + away,
+            defence + home,
+        ]
+    )
+    data = np.concatenate(
+        [recent, recent, recent, recent, recent, -recent, recent, recent]
+    )
+    matrix = sparse.coo_array(
+        (data, (rows, cols)), shape=(2 * n_matches, defence + n_teams)
+    ).tocsr()
+    targets = np.concatenate([home_score * recent, away_score * recent])
+    return matrix, targets
+
+
+def constraint_matrix(teams: list[Team], leagues: list[League]) -> sparse.csr_array:
+    constrained = np.array([team.in_solver_constraints for team in teams], dtype=float)
+    zeros = np.zeros(2 * len(leagues))
+    return sparse.csr_array(
+        [
+            np.concatenate([zeros, constrained, np.zeros(len(teams))]),
+            np.concatenate([zeros, np.zeros(len(teams)), constrained]),
+        ]
+    )
+
+
+def highs_solver(
+    matches: list[Match],
+    teams: list[Team],
+    leagues: list[League],
+    initial: dict[str, list[dict[str, float]]] | None = None,
+) -> dict[str, list[dict[str, float]]]:
+    teams, leagues = list(teams), list(leagues)
+    residuals, targets = residual_matrix(matches, teams, leagues)
+    n_rows, n_params = residuals.shape
+    n_bounded = 2 * len(leagues)
+
+    # Solve the dual of min sum|residuals @ params - targets|, which has one row
+    # per parameter instead of four per match. The ratings are its marginals.
+    dual = sparse.hstack(
+        [residuals.T, constraint_matrix(teams, leagues).T], format="csr"
+    )
+    if initial is not None:
+        x0 = dict_to_params(initial, teams, leagues)
+        params = warm_highs_solver(
+            dual, targets, n_bounded, x0, residuals @ x0 - targets
+        )
+        return params_to_dict(params, teams, leagues)
+
+    result = linprog(
+        c=-np.concatenate([targets, np.zeros(2)]),
+        A_ub=dual[:n_bounded],
+        b_ub=np.zeros(n_bounded),
+        A_eq=dual[n_bounded:],
+        b_eq=np.zeros(n_params - n_bounded),
+        bounds=np.concatenate(
+            [np.tile([-1, 1], (n_rows, 1)), np.tile([-np.inf, np.inf], (2, 1))]
+        ),
+        method="highs",
+    )
+    if result.status != 0:
+        raise SolverError(result.message)
+
+    params = -np.concatenate([result.ineqlin.marginals, result.eqlin.marginals])
+    return params_to_dict(params, teams, leagues)
+
+
+def warm_highs_solver(
+    dual: sparse.csr_array,
+    targets: np.ndarray,
+    n_bounded: int,
+    params: np.ndarray,
+    residuals: np.ndarray,
+    tolerance: float = 1e-7,
+) -> np.ndarray:
+    # linprog cannot take a starting basis, so pass the same dual to highspy
+    n_params, n_cols = dual.shape
+    n_rows = n_cols - 2
+    matrix = sparse.csc_array(dual)
+
+    lp = highspy.HighsLp()
+    lp.num_col_ = n_cols
+    lp.num_row_ = n_params
+    lp.col_cost_ = -np.concatenate([targets, np.zeros(2)])
+    lp.col_lower_ = np.concatenate([-np.ones(n_rows), np.full(2, -highspy.kHighsInf)])
+    lp.col_upper_ = np.concatenate([np.ones(n_rows), np.full(2, highspy.kHighsInf)])
+    lp.row_lower_ = np.concatenate(
+        [np.full(n_bounded, -highspy.kHighsInf), np.zeros(n_params - n_bounded)]
+    )
+    lp.row_upper_ = np.zeros(n_params)
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+    lp.a_matrix_.start_ = matrix.indptr
+    lp.a_matrix_.index_ = matrix.indices
+    lp.a_matrix_.value_ = matrix.data
+
+    highs = highspy.Highs()
+    highs.setOptionValue("output_flag", False)
+    highs.passModel(lp)
+    basis = warm_basis(params, residuals, n_bounded, tolerance)
+    if highs.setBasis(basis) != highspy.HighsStatus.kOk:
+        logging.warning("Warm start basis rejected, solving from scratch")
+        highs.clearSolver()
+
+    highs.run()
+    if highs.getModelStatus() != highspy.HighsModelStatus.kOptimal:
+        raise SolverError(highs.modelStatusToString(highs.getModelStatus()))
+    return -np.array(highs.getSolution().row_dual)
+
+
+def warm_basis(
+    params: np.ndarray, residuals: np.ndarray, n_bounded: int, tolerance: float
+) -> highspy.HighsBasis:
+    status = highspy.HighsBasisStatus
+
+    # Bounded ratings at zero keep their dual row basic. The residuals closest
+    # to zero fill the rest of the basis, every other dual variable sits at the
+    # bound given by the sign of its residual.
+    inactive = np.zeros(len(params), dtype=bool)
+    inactive[:n_bounded] = params[:n_bounded] <= tolerance
+    n_basic = max(len(params) - 2 - int(inactive.sum()), 0)
+    basic = np.zeros(len(residuals), dtype=bool)
+    basic[np.argsort(np.abs(residuals), kind="stable")[:n_basic]] = True
+
+    basis = highspy.HighsBasis()
+    basis.col_status = [
+        status.kBasic if is_basic else status.kUpper if r < 0 else status.kLower
+        for is_basic, r in zip(basic.tolist(), residuals.tolist())
+    ] + [status.kBasic, status.kBasic]
+    basis.row_status = [
+        status.kBasic if is_inactive else status.kUpper
+        for is_inactive in inactive.tolist()
+    ]
+    basis.valid = True
+    return basis
+
+
+def dict_to_params(
+    ratings: dict[str, list[dict[str, float]]],
+    teams: list[Team],
+    leagues: list[League],
+) -> np.ndarray:
+    # New teams start at zero, new leagues at the mean of the known ones
+    previous_leagues = {league["division"]: league for league in ratings["leagues"]}
+    previous_teams = {team["id"]: team for team in ratings["teams"]}
+    avg_goal = np.mean([league["avg_goal"] for league in ratings["leagues"]] or [0])
+    home_adv = np.mean([league["home_adv"] for league in ratings["leagues"]] or [0])
+    default_league = {"avg_goal": avg_goal, "home_adv": home_adv}
+    default_team = {"offence": 0, "defence": 0}
+
+    leagues = [previous_leagues.get(league.name, default_league) for league in leagues]
+    teams = [previous_teams.get(team.id, default_team) for team in teams]
+    return np.array(
+        [league["avg_goal"] for league in leagues]
+        + [league["home_adv"] for league in leagues]
+        + [team["offence"] for team in teams]
+        + [team["defence"] for team in teams],
+        dtype=float,
+    )
+
+
+def params_to_dict(
+    params: np.ndarray, teams: list[Team], leagues: list[League]
+) -> dict[str, list[dict[str, float]]]:
+    n_leagues, n_teams = len(leagues), len(teams)
+    avg_goal, home_adv, offence, defence = np.split(
+        params, [n_leagues, 2 * n_leagues, 2 * n_leagues + n_teams]
+    )
+    return {
+        "leagues": [
+            {
+                "division": league.name,
+                "avg_goal": float(avg_goal[i]),
+                "home_adv": float(home_adv[i]),
+            }
+            for i, league in enumerate(leagues)
+        ],
+        "teams": [
+            {
+                "id": team.id,
+                "offence": float(offence[i]),
+                "defence": float(defence[i]),
+            }
+            for i, team in enumerate(teams)
+        ],
+    }
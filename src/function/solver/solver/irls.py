@@ -0,0 +1,83 @@
+import numpy as np
+from scipy import linalg, sparse
+
+from solver.highs import (
+    constraint_matrix,
+    dict_to_params,
+    params_to_dict,
+    residual_matrix,
+)
+from solver.models import League, Match, Team
+
+TOLERANCE = 1e-4
+
+
+def nullspace_basis(constraints: sparse.csr_array) -> sparse.csc_array:
+    # Each constraint sums a disjoint set of params to zero, so the first param
+    # of each set is minus the sum of the others and the rest stay free
+    n_params = constraints.shape[1]
+    supports = [np.flatnonzero(row) for row in constraints.toarray()]
+    supports = [support for support in supports if len(support)]
+    pivots = [support[0] for support in supports]
+    free = np.setdiff1d(np.arange(n_params), pivots)
+    position = np.zeros(n_params, dtype=int)
+    position[free] = np.arange(len(free))
+
+    rows = np.concatenate([free, *[np.full(len(s) - 1, s[0]) for s in supports]])
+    cols = np.concatenate([position[free], *[position[s[1:]] for s in supports]])
+    data = np.concatenate([np.ones(len(free)), -np.ones(len(rows) - len(free))])
+    return sparse.csc_array((data, (rows, cols)), shape=(n_params, len(free)))
+
+
+def weighted_least_squares(
+    residuals: sparse.csr_array,
+    targets: np.ndarray,
+    weights: np.ndarray,
+    ridge: float = 1e-9,
+) -> np.ndarray:
+    # The normal equations fill in too much for a sparse factorisation to pay
+    weighted = residuals.T @ sparse.dia_array((weights, 0), shape=(len(weights),) * 2)
+    normal = (weighted @ residuals).toarray()
+    normal[np.diag_indices_from(normal)] += ridge * normal.diagonal().mean()
+    return linalg.solve(normal, weighted @ targets, assume_a="pos")
+
+
+def irls_solver(
+    matches: list[Match],
+    teams: list[Team],
+    leagues: list[League],
+    tolerance: float = TOLERANCE,
+    initial: dict[str, list[dict[str, float]]] | None = None,
+    max_iter: int = 100,
+    delta: float = 1e-4,
+) -> dict[str, list[dict[str, float]]]:
+    teams, leagues = list(teams), list(leagues)
+    residuals, targets = residual_matrix(matches, teams, leagues)
+    basis = nullspace_basis(constraint_matrix(teams, leagues))
+    reduced = sparse.csr_array(residuals @ basis)
+    n_bounded = 2 * len(leagues)
+
+    # Iteratively reweighted least squares: weighting each squared error by the
+    # inverse of its last absolute error approximates the L1 objective. The
+    # params are kept in the nullspace of the sum-to-zero constraints. Stop once
+    # an iteration improves the objective by less than the tolerance.
+    if initial is None:
+        weights = np.ones(len(targets))
+    else:
+        error = np.abs(residuals @ dict_to_params(initial, teams, leagues) - targets)
+        weights = 1 / np.maximum(error, delta)
+
+    best, objective = None, np.inf
+    for _ in range(max_iter):
+        params = basis @ weighted_least_squares(reduced, targets, weights)
+        params[:n_bounded] = np.maximum(params[:n_bounded], 0)
+
+        error = np.abs(residuals @ params - targets)
+        improvement = objective - error.sum()
+        if improvement > 0:
+            best, objective = params, error.sum()
+        if improvement <= tolerance * objective:
+            break
+        weights = 1 / np.maximum(error, delta)
+
+    return params_to_dict(best, teams, leagues)
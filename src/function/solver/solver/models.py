@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from functools import cached_property
 
 from pulp import LpVariable
 
@@ -7,9 +8,13 @@ from pulp import LpVariable
 class League:
     name: str
 
-    def __post_init__(self):
-        self.avg_goal = LpVariable(f"avg_goal_{self.name}", lowBound=0)
-        self.home_adv = LpVariable(f"home_adv_{self.name}", lowBound=0)
+    @cached_property
+    def avg_goal(self) -> LpVariable:
+        return LpVariable(f"avg_goal_{self.name}", lowBound=0)
+
+    @cached_property
+    def home_adv(self) -> LpVariable:
+        return LpVariable(f"home_adv_{self.name}", lowBound=0)
 
 
 @dataclass
@@ -17,9 +22,13 @@ class Team:
     id: str
     in_solver_constraints: bool
 
-    def __post_init__(self):
-        self.offence = LpVariable(f"offence_{self.id}")
-        self.defence = LpVariable(f"defence_{self.id}")
+    @cached_property
+    def offence(self) -> LpVariable:
+        return LpVariable(f"offence_{self.id}")
+
+    @cached_property
+    def defence(self) -> LpVariable:
+        return LpVariable(f"defence_{self.id}")
 
 
 @dataclass
@@ -32,9 +41,13 @@ class Match:
     away_score: float
     recent: float
 
-    def __post_init__(self):
-        self.home_error = LpVariable(f"home_error_{self.id}")
-        self.away_error = LpVariable(f"away_error_{self.id}")
+    @cached_property
+    def home_error(self) -> LpVariable:
+        return LpVariable(f"home_error_{self.id}")
+
+    @cached_property
+    def away_error(self) -> LpVariable:
+        return LpVariable(f"away_error_{self.id}")
 
     @property
     def home_error_val(self):
@@ -3,10 +3,26 @@ from gcp import bigquery
 
 
 def get_matches_and_teams(_type: str, max_time: int) -> dict:
-    data = bigquery.query_dict(
-        query="SELECT * FROM `solver.get_matches`(@type, @max_time);",
-        params={"type": _type, "max_time": max_time},
+    return get_matches_and_teams_batch({_type: max_time})[_type]
+
+
+def get_matches_and_teams_batch(max_times: dict[str, int]) -> dict[str, dict]:
+    # One round trip for every type, tagged so the rows can be split again
+    query = " UNION ALL ".join(
+        f"SELECT @type_{i} AS _TYPE, * FROM `solver.get_matches`(@type_{i}, @max_time_{i})"
+        for i in range(len(max_times))
     )
+    params = {}
+    for i, (_type, max_time) in enumerate(max_times.items()):
+        params |= {f"type_{i}": _type, f"max_time_{i}": max_time}
+    data = bigquery.query_dict(query=f"{query};", params=params)
+    return {
+        _type: to_models([match for match in data if match["_TYPE"] == _type])
+        for _type in max_times
+    }
+
+
+def to_models(data: list[dict]) -> dict:
     league_names = {match["league_name"] for match in data}
     leagues = {name: League(name) for name in league_names}
     team_ids = {(match["home_id"], match["home_team_in_rating"]) for match in data} | {
@@ -17,8 +33,8 @@ def get_matches_and_teams(_type: str, max_time: int) -> dict:
         for id, in_team_rating in team_ids
     }
     return {
-        "leagues": leagues.values(),
-        "teams": teams.values(),
+        "leagues": list(leagues.values()),
+        "teams": list(teams.values()),
         "matches": [
             Match(
                 id=match["id"],
@@ -32,3 +48,10 @@ def get_matches_and_teams(_type: str, max_time: int) -> dict:
             for match in data
         ],
     }
+
+
+def get_match_history(_type: str, min_time: int, max_time: int) -> list[dict]:
+    return bigquery.query_dict(
+        query="SELECT * FROM `solver.get_match_history`(@type, @min_time, @max_time);",
+        params={"type": _type, "min_time": min_time, "max_time": max_time},
+    )
@@ -1,9 +1,31 @@
+import logging
+
 from pulp import LpMinimize, LpProblem, lpSum
 
+from solver.highs import SolverError, highs_solver
+from solver.irls import TOLERANCE, irls_solver
 from solver.models import League, Match, Team
 
 
 def solver(
+    matches: list[Match],
+    teams: list[Team],
+    leagues: list[League],
+    backend: str = "highs",
+    initial: dict[str, list[dict[str, float]]] | None = None,
+    tolerance: float = TOLERANCE,
+) -> dict[str, list[dict[str, float]]]:
+    if backend == "irls":
+        return irls_solver(matches, teams, leagues, tolerance, initial)
+    if backend == "highs":
+        try:
+            return highs_solver(matches, teams, leagues, initial)
+        except SolverError as error:
+            logging.warning(f"HiGHS solver failed, falling back to pulp: {error=}")
+    return pulp_solver(matches, teams, leagues)
+
+
+def pulp_solver(
     matches: list[Match], teams: list[Team], leagues: list[League]
 ) -> dict[str, list[dict[str, float]]]:
     prob = LpProblem(sense=LpMinimize)
@@ -10,5 +10,5 @@ def get_topic_path(topic: str) -> str:
     return CLIENT.topic_path(project=os.environ["GCP_PROJECT"], topic=topic)
 
 
-def publish_json_message(topic: str, data: dict):
+def publish_json_message(topic: str, data: dict | list):
     return CLIENT.publish(topic, data=json.dumps(data).encode())
@@ -0,0 +1,113 @@
+import argparse
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from scipy.optimize import minimize_scalar
+
+from match_probs import MAX_GOALS, match_probs, parse_handicaps
+
+QUERY = Path(__file__).parents[1] / "bigquery/sql/operations/get_kelly_history.sql"
+
+
+@dataclass
+class Bets:
+    odds: np.ndarray
+    kelly: np.ndarray
+    results: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: list[dict], max_goals: int = MAX_GOALS) -> "Bets":
+        home_exp = np.array([row["home_exp"] for row in rows], dtype=float)
+        away_exp = np.array([row["away_exp"] for row in rows], dtype=float)
+        handicaps = [row["handicap"] for row in rows]
+        odds_home = np.array([row["HDC_H"] for row in rows], dtype=float)
+        odds_away = np.array([row["HDC_A"] for row in rows], dtype=float)
+        goal_diff = np.array([row["goal_diff"] for row in rows], dtype=float)
+
+        # Same stakes as get_daily_suggestions.sql, a handicap draw is a refund
+        probs = match_probs(home_exp, away_exp, handicaps, max_goals)
+        kelly_home = probs[:, 0] - probs[:, 2] / (odds_home - 1)
+        kelly_away = probs[:, 2] - probs[:, 0] / (odds_away - 1)
+        lines = parse_handicaps(handicaps)
+        results = np.sign(goal_diff[:, None] + lines).mean(axis=1)
+
+        # Bets stay in kick-off order, home before away for the same match
+        kelly = np.stack([kelly_home, kelly_away], axis=1)
+        placed = kelly > 0
+        return cls(
+            odds=np.stack([odds_home, odds_away], axis=1)[placed],
+            kelly=kelly[placed],
+            results=np.stack([results, -results], axis=1)[placed],
+        )
+
+    def __len__(self) -> int:
+        return len(self.odds)
+
+    def returns(self, fractions: np.ndarray) -> np.ndarray:
+        # Bankroll multiplier of every bet (columns) under every fraction of the
+        # full Kelly stake (rows), a half win or loss settles half the stake
+        stakes = np.asarray(fractions, dtype=float)[:, None] * self.kelly[None, :]
+        payout = np.where(self.results > 0, self.odds - 1, 1) * self.results
+        return 1 + stakes * payout[None, :]
+
+    def log_growth(self, fractions: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth = np.log(self.returns(fractions)).sum(axis=1)
+        return np.where(np.isnan(growth), -np.inf, growth)
+
+    def best_fraction(self, max_fraction: float = 1.0) -> float:
+        # Log growth is concave in the fraction, so a bounded search finds it
+        result = minimize_scalar(
+            lambda fraction: -self.log_growth([fraction])[0],
+            bounds=(0, max_fraction),
+            method="bounded",
+        )
+        return float(result.x)
+
+    def drawdowns(self, fractions: np.ndarray) -> np.ndarray:
+        bankrolls = np.cumprod(self.returns(fractions), axis=1)
+        peaks = np.maximum.accumulate(np.maximum(bankrolls, 1), axis=1)
+        return 1 - bankrolls / peaks
+
+
+def query_rows() -> list[dict]:
+    # Imported here so reading a file or using Bets needs no BigQuery client
+    from google.cloud import bigquery
+
+    client = bigquery.Client()
+    return [dict(row) for row in client.query(QUERY.read_text()).result()]
+
+
+def read_rows(path: str) -> list[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest Kelly staking fractions")
+    parser.add_argument("--file", help="Newline delimited JSON of the query result")
+    parser.add_argument("--max-fraction", type=float, default=1.0)
+    parser.add_argument("--max-goals", type=int, default=MAX_GOALS)
+    args = parser.parse_args()
+
+    rows = read_rows(args.file) if args.file else query_rows()
+    bets = Bets.from_rows(rows, args.max_goals)
+    fractions = np.linspace(0, args.max_fraction, 101)[1:]
+    growths = bets.log_growth(fractions)
+    max_drawdowns = bets.drawdowns(fractions).max(axis=1)
+    for fraction, growth, max_drawdown in zip(
+        fractions[9::10], growths[9::10], max_drawdowns[9::10]
+    ):
+        print(
+            f"Fraction {fraction:.2f} (kelly_ratio {1 / fraction:.1f}): "
+            f"log growth {growth:.4f}, max drawdown {max_drawdown:.2%}"
+        )
+
+    best = bets.best_fraction(args.max_fraction)
+    print(
+        f"Best fraction {best:.4f} (kelly_ratio {1 / best:.1f}) over {len(bets)} bets: "
+        f"log growth {bets.log_growth([best])[0]:.4f}, "
+        f"max drawdown {bets.drawdowns([best]).max():.2%}"
+    )
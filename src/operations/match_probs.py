@@ -0,0 +1,133 @@
+import argparse
+import json
+import math
+import sys
+from functools import cache
+from typing import Iterable
+
+import numpy as np
+
+# Same as functions.matchProbs, which lumps five or more goals together
+MAX_GOALS = 5
+
+
+def poisson_pmf(exp: np.ndarray, max_goals: int = MAX_GOALS) -> np.ndarray:
+    # Built up as a running product so no factorial is recomputed, with the
+    # tail beyond the goal cap folded into the last column
+    exp = np.asarray(exp, dtype=float)[:, None]
+    ratios = np.concatenate(
+        [np.ones((len(exp), 1)), exp / np.arange(1, max_goals)], axis=1
+    )
+    pmf = np.exp(-exp) * np.cumprod(ratios, axis=1)
+    return np.concatenate([pmf, 1 - pmf.sum(axis=1, keepdims=True)], axis=1)
+
+
+def goal_diff_probs(
+    home_exp: np.ndarray, away_exp: np.ndarray, max_goals: int = MAX_GOALS
+) -> np.ndarray:
+    # Column k is the probability of the home side winning by k - max_goals
+    home, away = poisson_pmf(home_exp, max_goals), poisson_pmf(away_exp, max_goals)
+    scorelines = (home[:, :, None] * away[:, None, :]).reshape(len(home), -1)
+    goals = np.arange(max_goals + 1)
+    diffs = (goals[:, None] - goals[None, :]).ravel() + max_goals
+    return scorelines @ np.eye(2 * max_goals + 1)[diffs]
+
+
+@cache
+def parse_handicap(handicap: str | float | None) -> tuple[float, float]:
+    # A quarter ball like "-0.5/-1" is half the stake on each line, a single
+    # line is treated as the same line twice
+    if handicap is None:
+        return np.nan, np.nan
+    parts = [float(part) for part in str(handicap).split("/")]
+    return parts[0], parts[-1]
+
+
+def parse_handicaps(handicaps: Iterable[str | float | None]) -> np.ndarray:
+    lines = [parse_handicap(handicap) for handicap in handicaps]
+    return np.array(lines, dtype=float).reshape(-1, 2)
+
+
+def match_probs(
+    home_exp: np.ndarray,
+    away_exp: np.ndarray,
+    handicaps: Iterable[str | float | None] | None = None,
+    max_goals: int = MAX_GOALS,
+) -> np.ndarray:
+    """Home win, draw and away win probabilities after the home handicap.
+
+    Rows with a missing expected goal or handicap are all NaN, as the UDF
+    returns nulls for them.
+    """
+    home_exp = np.asarray(home_exp, dtype=float)
+    away_exp = np.asarray(away_exp, dtype=float)
+    if handicaps is None:
+        lines = np.zeros((len(home_exp), 2))
+    else:
+        lines = parse_handicaps(handicaps)
+
+    diffs = goal_diff_probs(home_exp, away_exp, max_goals)
+    goal_diff = np.arange(-max_goals, max_goals + 1)
+    probs = np.zeros((len(home_exp), 3))
+    for line in lines.T:
+        adjusted = goal_diff[None, :] + line[:, None]
+        probs[:, 0] += (diffs * (adjusted > 0)).sum(axis=1)
+        probs[:, 1] += (diffs * (adjusted == 0)).sum(axis=1)
+        probs[:, 2] += (diffs * (adjusted < 0)).sum(axis=1)
+    probs /= 2
+
+    missing = np.isnan(home_exp) | np.isnan(away_exp) | np.isnan(lines).any(axis=1)
+    probs[missing] = np.nan
+    return probs
+
+
+def probability_table(
+    step: float = 0.05,
+    min_exp: float = 0.2,
+    max_exp: float = 5.0,
+    max_handicap: float = 3.0,
+    max_goals: int = MAX_GOALS,
+) -> list[dict]:
+    # Expected goals on a grid and every quarter ball line up to the maximum,
+    # so the SQL can join on the expected goals rounded to the step and on
+    # LEAST and GREATEST of the two handicap lines
+    exps = np.round(np.arange(min_exp, max_exp + step / 2, step), 10)
+    home_exp, away_exp = (grid.ravel() for grid in np.meshgrid(exps, exps))
+    rows = []
+    for quarter in range(-round(max_handicap * 4), round(max_handicap * 4) + 1):
+        low, high = math.floor(quarter / 2) / 2, math.ceil(quarter / 2) / 2
+        probs = match_probs(
+            home_exp, away_exp, [f"{low}/{high}"] * len(home_exp), max_goals
+        )
+        rows.extend(
+            {
+                "home_exp": home,
+                "away_exp": away,
+                "handicap_low": low,
+                "handicap_high": high,
+                "probs": prob,
+            }
+            for home, away, prob in zip(
+                home_exp.tolist(), away_exp.tolist(), probs.tolist()
+            )
+        )
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Write a matchProbs table as newline delimited JSON"
+    )
+    parser.add_argument("--step", type=float, default=0.05)
+    parser.add_argument("--max-exp", type=float, default=5.0)
+    parser.add_argument("--max-handicap", type=float, default=3.0)
+    parser.add_argument("--max-goals", type=int, default=MAX_GOALS)
+    args = parser.parse_args()
+
+    table = probability_table(
+        step=args.step,
+        max_exp=args.max_exp,
+        max_handicap=args.max_handicap,
+        max_goals=args.max_goals,
+    )
+    sys.stdout.writelines(json.dumps(row) + "\n" for row in table)